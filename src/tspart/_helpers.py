@@ -140,6 +140,13 @@ def factors_from_image_multi(grayscale_arrays, points_list, blur_sigma=1):
     return factors_list
 
 
+def white_mask(grayscale_array, threshold=254, blur_sigma=1):
+    if blur_sigma > 0:
+        grayscale_array = scipy.ndimage.gaussian_filter(grayscale_array, sigma=blur_sigma)
+
+    return np.asarray(grayscale_array) > threshold
+
+
 def filter_white_points(grayscale_array, points, threshold=254, blur_sigma=1):
     if blur_sigma > 0:
         grayscale_array = scipy.ndimage.gaussian_filter(grayscale_array, sigma=blur_sigma)
@@ -0,0 +1,145 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser("~"), ".cache", "tspart", "tours")
+
+
+def _canonical_order(points, decimals=2):
+    # Sort order of the rounded points, the same for any permutation of them
+    points = np.round(np.asarray(points, dtype=np.float64).reshape(-1, 2), decimals) + 0.0
+    return points, np.lexsort((points[:, 1], points[:, 0]))
+
+
+def points_key(points, symmetric=True, endpoints=None, decimals=2):
+    """
+    Return the cache key of a point set: a hash of its points rounded to
+    decimals places, independent of their order, and of the route type
+    (closed, or open between the given endpoints point indexes).
+    """
+
+    rounded, order = _canonical_order(points, decimals)
+    digest = hashlib.sha256(rounded[order].tobytes())
+    if symmetric:
+        digest.update(b"closed")
+    else:
+        ranks = np.empty(len(order), dtype=np.int64)
+        ranks[order] = np.arange(len(order))
+        digest.update(f"open {ranks[endpoints[0]]} {ranks[endpoints[1]]}".encode())
+
+    return digest.hexdigest()
+
+
+class TourCache:
+    """
+    Disk cache of the best tour found for every point set (see
+    points_key), whatever solved it. Tours are stored as compact index
+    arrays in directory, the least recently used ones being evicted above
+    max_megabytes.
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_megabytes=256, decimals=2):
+        self.directory = directory
+        self.max_megabytes = max_megabytes
+        self.decimals = decimals
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _filename(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def _read(self, key):
+        try:
+            with np.load(self._filename(key)) as entry:
+                return entry["tour"].astype(np.int64), float(entry["length"])
+        except (FileNotFoundError, OSError, ValueError, KeyError):
+            return None, None
+
+    def get(self, points, symmetric=True, endpoints=None):
+        """
+        Return the cached tour (point indexes, each visited once, from
+        start to end when not symmetric) of points, or None.
+        """
+
+        key = points_key(points, symmetric, endpoints, self.decimals)
+        tour, _ = self._read(key)
+        if tour is None or len(tour) != len(points):
+            return None
+
+        # Mark as recently used
+        try:
+            os.utime(self._filename(key))
+        except FileNotFoundError:
+            pass
+
+        return _canonical_order(points, self.decimals)[1][tour]
+
+    def put(self, points, tour, symmetric=True, endpoints=None):
+        """
+        Store tour (point indexes, the start may be repeated at the end)
+        for points, unless the cached one is at least as short. Return
+        whether it was stored.
+        """
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        tour = np.asarray(tour, dtype=np.int64)
+        if len(tour) == len(points) + 1 and tour[0] == tour[-1]:
+            tour = tour[:-1]
+        if len(tour) != len(points) or len(np.unique(tour)) != len(points):
+            return False
+
+        ordered = points[tour]
+        segments = np.diff(np.vstack([ordered, ordered[:1]]) if symmetric else ordered, axis=0)
+        length = float(np.hypot(segments[:, 0], segments[:, 1]).sum())
+
+        key = points_key(points, symmetric, endpoints, self.decimals)
+        _, cached_length = self._read(key)
+        if cached_length is not None and cached_length <= length:
+            return False
+
+        # Indexes into the canonical order, in the smallest integer type
+        ranks = np.empty(len(points), dtype=np.int64)
+        ranks[_canonical_order(points, self.decimals)[1]] = np.arange(len(points))
+        dtype = np.uint16 if len(points) <= np.iinfo(np.uint16).max + 1 else np.uint32
+
+        # Write then rename, so concurrent solves never read a partial file
+        handle, temporary = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        with os.fdopen(handle, "wb") as f:
+            np.savez(f, tour=ranks[tour].astype(dtype), length=np.float64(length))
+        os.replace(temporary, self._filename(key))
+
+        self.evict()
+        return True
+
+    def evict(self):
+        """
+        Delete the least recently used tours until the cache fits in
+        max_megabytes.
+        """
+
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npz"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum([_[1] for _ in entries])
+        for _, size, path in sorted(entries):
+            if total <= self.max_megabytes * 1024 * 1024:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory, exist_ok=True)
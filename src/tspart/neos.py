@@ -101,7 +101,7 @@ def cancel_solves(client, job_list):
         )
 
 
-def get_solve(client, job_number, password, points=None):
+def get_solve(client, job_number, password, points=None, cache=None):
     if client.getJobStatus(job_number, password) != "Done":
         return None
 
@@ -145,10 +145,13 @@ def get_solve(client, job_number, password, points=None):
     if points is None:
         return tour
 
+    if cache is not None:
+        cache.put(points, tour)
+
     return _map_points_to_tour(points, tour)
 
 
-def get_solves(client, job_list, points_list=None):
+def get_solves(client, job_list, points_list=None, cache=None):
     result = []
     for idx, (job_number, password) in enumerate(job_list):
         points = None
@@ -159,7 +162,8 @@ def get_solves(client, job_list, points_list=None):
             client=client,
             job_number=job_number,
             password=password,
-            points=points
+            points=points,
+            cache=cache
         )
 
         result.append(r)
@@ -63,6 +63,8 @@ class TspStudio:
         self.neos = None
         self.factors = None
         self.num_channels = None
+        self._previous_points = None
+        self._previous_size = None
 
         self.mode = mode
         self.invert = invert
@@ -105,6 +107,9 @@ class TspStudio:
 
     @image.setter
     def image(self, value: Image.Image | str):
+        if getattr(self, "_points", None) is not None:
+            self._discard_points()
+
         if isinstance(value, str):
             self.image_string = value
             self._image = _image_to_array(_base64_to_image(self.image_string))
@@ -130,8 +135,25 @@ class TspStudio:
     def num_points(self, value: int):
         self._num_points = max(1, value)
 
+        self._discard_points()
+
+    def _discard_points(self):
+        # Keep the discarded points around to warm start the next stipple
+        if getattr(self, "_points", None) is not None:
+            self._previous_points = self._points
+            self._previous_size = self.size
+
         self.points = None
 
+    def _warm_start_points(self):
+        if self.points is not None:
+            return self.points
+        if self._previous_points is None or len(self._previous_points) != self.num_channels:
+            return None
+
+        scale = np.array(self.size) / np.array(self._previous_size)
+        return [np.asarray(_) * scale for _ in self._previous_points]
+
     @property
     def line_width(self) -> float:
         return self._line_width
@@ -232,15 +254,69 @@ class TspStudio:
             studio=self
         )
 
-    def stipple(self, iterations=50, logging=True):
-        self.points = _voronoi.stipple_image_multi(
+    def stipple(
+            self,
+            iterations=None,
+            method=_voronoi.CentroidMethod.OUTLINE,
+            init_method=_voronoi.InitializationMethod.REJECTION,
+            tolerance=None,
+            criterion=_voronoi.ConvergenceCriterion.MEAN,
+            freeze_tolerance=None,
+            border_only=False,
+            pyramid_levels=1,
+            refine_iterations=10,
+            tile_size=None,
+            halo=None,
+            memmap_dir=None,
+            dtype=np.float64,
+            memory_budget=None,
+            workers=1,
+            warm_start=False,
+            warm_iterations=10,
+            mask_white=False,
+            repair=False,
+            symmetric=True,
+            logging=True
+    ):
+        # With repair, the routes of a routed studio (closed, or open when not symmetric) are repaired for the new
+        # points instead of discarded
+        routes = list(self.points) if repair and self.is_routed and self.points is not None else None
+
+        # With mask_white, the white areas are masked out of the density instead of filtered out afterwards
+        mask_white = mask_white and self.white_threshold < 255
+
+        # Warm start from the current (or last discarded) points, running warm_iterations unless iterations is given
+        initial_points_list = None
+        if warm_start:
+            initial_points_list = self._warm_start_points()
+        if iterations is None:
+            iterations = 50 if initial_points_list is None else warm_iterations
+
+        self.points, stats = _voronoi.stipple_image_multi(
             grayscale_arrays=self.channels,
             points=self.num_points,
             iterations=iterations,
+            method=method,
+            init_method=init_method,
+            tolerance=tolerance,
+            criterion=criterion,
+            freeze_tolerance=freeze_tolerance,
+            border_only=border_only,
+            pyramid_levels=pyramid_levels,
+            refine_iterations=refine_iterations,
+            initial_points_list=initial_points_list,
+            tile_size=tile_size,
+            halo=halo,
+            memmap_dir=memmap_dir,
+            dtype=dtype,
+            memory_budget=memory_budget,
+            white_threshold=self.white_threshold if mask_white else None,
+            workers=workers,
+            return_stats=True,
             logging=logging
         )
 
-        if self.white_threshold < 255:
+        if self.white_threshold < 255 and not mask_white:
             self.points = _filter_white_points_multi(
                 grayscale_arrays=self.channels,
                 points_list=self.points,
@@ -256,6 +332,36 @@ class TspStudio:
                 raise InadequateResultsWarning(f"Channel {idx}: "
                                                f"Stippling produced very few ({length}) points, solves may fail")
 
+        if routes is not None:
+            self.repair_routes(
+                routes=routes,
+                symmetric=symmetric,
+                logging=logging
+            )
+
+        return stats
+
+    def repair_routes(self, routes, symmetric=True, tolerance=None, logging=True):
+        # Order the current points along routes (the points of a previous solve) instead of solving them again
+        if self.points is None:
+            raise ValueError("Points not initialized")
+
+        if any([isinstance(_, Sequence) for _ in self._jobs]):
+            self.cancel_online_solves()
+
+        self.points = [
+            _tsp.repair_tour(
+                points=points,
+                route=routes[idx],
+                symmetric=symmetric,
+                tolerance=tolerance,
+                logging=logging
+            )
+            for idx, points in enumerate(self.points)
+        ]
+        self.jobs = [True] * len(self.points)
+        self.is_routed = True
+
     def _compute_factors(self):
         if self.points is None:
             raise ValueError("Points not initialized")
@@ -279,23 +385,38 @@ class TspStudio:
 
         return job_number, password
 
-    def _get_online_solve(self, points, job_number, password):
+    def _get_online_solve(self, points, job_number, password, cache=None):
         self._setup_online_solves()
 
         return _neos.get_solve(
             client=self.neos,
             job_number=job_number,
             password=password,
-            points=points
+            points=points,
+            cache=cache
         )
 
-    def submit_online_solves(self, email, logging=True):
+    def submit_online_solves(self, email, cache=None, reuse_cached=False, logging=True):
         self._setup_online_solves()
 
         def message(text):
             if logging:
                 print(text, file=sys.stderr)
 
+        # With reuse_cached, channels with a cached tour need no solve
+        jobs_cached = 0
+        if cache is not None and reuse_cached:
+            for idx, job in enumerate(self._jobs):
+                if job is None or job is False:
+                    tour = cache.get(self.points[idx])
+                    if tour is not None:
+                        self._points[idx] = np.asarray(self.points[idx])[tour]
+                        self._jobs[idx] = True
+                        jobs_cached += 1
+                        message(f"Using a cached tour for solve #{idx}.")
+            if jobs_cached > 0:
+                self._compute_factors()
+
         jobs_submitted = 0
 
         num_jobs_to_submit = sum([_ is None or _ is False for _ in self._jobs])
@@ -322,7 +443,7 @@ class TspStudio:
 
         return jobs_submitted
 
-    def get_online_solves(self, logging=True):
+    def get_online_solves(self, cache=None, logging=True):
         if self.points is None:
             raise ValueError("Points not initialized")
 
@@ -344,7 +465,8 @@ class TspStudio:
                         result = self._get_online_solve(
                             points=self.points[idx],
                             job_number=job_number,
-                            password=password
+                            password=password,
+                            cache=cache
                         )
                         if result is not None:
                             self._points[idx] = result
@@ -383,6 +505,8 @@ class TspStudio:
             email,
             delay_minutes=0.25,
             requeue_minutes=10,
+            cache=None,
+            reuse_cached=False,
             logging=True,
             save_filename=None
     ):
@@ -417,6 +541,8 @@ class TspStudio:
             if num_jobs_to_submit > 0:
                 jobs_submitted = self.submit_online_solves(
                     email=email,
+                    cache=cache,
+                    reuse_cached=reuse_cached,
                     logging=logging
                 )
                 save_file()
@@ -427,6 +553,7 @@ class TspStudio:
             jobs_not_ended = [not isinstance(_, bool) for _ in self._jobs]
             while any(jobs_not_ended):
                 jobs_gotten = self.get_online_solves(
+                    cache=cache,
                     logging=logging
                 )
 
@@ -461,43 +588,116 @@ class TspStudio:
         save_file()
         return True
 
-    def offline_solves(self, time_limit_minutes=60, symmetric=True, logging=True, verbose=False):
-        # TODO: Logging, partial solution saving, checkpointing
-
+    def offline_solves(
+            self,
+            time_limit_minutes=60,
+            symmetric=True,
+            solver=_tsp.Solver.ORTOOLS,
+            warm_start=False,
+            resume=False,
+            workers=1,
+            split_time=False,
+            checkpoint_filename=None,
+            checkpoint_minutes=5,
+            gap=None,
+            cache=None,
+            reuse_cached=False,
+            cluster_size=5000,
+            solver_workers=None,
+            logging=True,
+            verbose=False
+    ):
         if self.points is None:
             raise ValueError("Points not initialized")
 
         self.cancel_online_solves()
 
+        # Closed OR-tools routes repeat their start at the end, solve each point once
+        points_list = [np.asarray(_) for _ in self.points]
+        factors_list = None if self.factors is None else [np.asarray(_) for _ in self.factors]
+        for idx, points in enumerate(points_list):
+            if len(points) > 1 and (points[0] == points[-1]).all():
+                points_list[idx] = points[:-1]
+                if factors_list is not None:
+                    factors_list[idx] = factors_list[idx][:-1]
+
+        # Routed points (or checkpointed ones, when resuming) are already in tour order, start the search from them
+        initial_tours = None
+        if (warm_start and self.is_routed) or resume:
+            initial_tours = [np.arange(len(_)) for _ in points_list]
+
+        # Keep the best tour of every channel as its point order, saved every checkpoint_minutes
+        self._points = list(self.points)
+        last_checkpoint = time.time()
+
+        def checkpoint(idx, tour, cost, timestamp):
+            nonlocal last_checkpoint
+            self._points[idx] = np.asarray(points_list[idx])[tour]
+            if factors_list is not None:
+                self.factors[idx] = np.asarray(factors_list[idx])[tour]
+            if timestamp - last_checkpoint >= checkpoint_minutes * 60:
+                self.save(checkpoint_filename)
+                last_checkpoint = timestamp
+                if logging:
+                    print(f"Checkpointed solve #{idx} (cost {cost:.0f}) to {checkpoint_filename}", file=sys.stderr)
+
+        # Only OR-tools solves stop at a gap, report theirs
+        report_gaps = gap is not None and _tsp.Solver(solver) == _tsp.Solver.ORTOOLS
         results = _tsp.heuristic_solves(
-            points_list=self.points,
+            points_list=points_list,
             time_limit_minutes=time_limit_minutes,
             symmetric=symmetric,
+            solver=solver,
+            initial_tours=initial_tours,
+            workers=workers,
+            split_time=split_time,
+            solution_callback=None if checkpoint_filename is None else checkpoint,
+            gap=gap,
+            return_gaps=report_gaps,
+            cache=cache,
+            reuse_cached=reuse_cached,
+            cluster_size=cluster_size,
+            solver_workers=solver_workers,
             logging=logging,
             verbose=verbose
         )
+        if report_gaps:
+            results, gaps = results
+            for idx, channel_gap in enumerate(gaps):
+                if logging and channel_gap is not None:
+                    print(f"Solve #{idx} is within about {channel_gap:.2f}% of its Held-Karp estimate",
+                          file=sys.stderr)
 
         if all([_ is not None for _ in results]):
             self.points = results
             self.jobs = [True] * len(results)
             self.is_routed = True
+            if checkpoint_filename is not None:
+                self.save(checkpoint_filename)
             return True
 
         return False
 
-    def draw(self, scale=1, minimum_line_width_factor=(1/255), closed=True, subpixels=8):
+    def draw(self, scale=1, minimum_line_width_factor=(1/255), closed=True, subpixels=8, preview=False):
         if self.points is None:
             raise ValueError("Points not initialized")
         if self.factors is None:
             raise ValueError("Factors not initialized")
+
+        points, factors = self.points, self.factors
         if not self.is_routed:
-            raise ValueError("Not routed yet")
+            if not preview:
+                raise ValueError("Not routed yet")
+            # Draft routes along a Hilbert curve
+            tours = [_tsp.hilbert_tour(_) for _ in points]
+            points = [np.asarray(p)[t] for p, t in zip(points, tours)]
+            factors = [np.asarray(f)[t] for f, t in zip(factors, tours)]
 
         match self.mode:
             case ColorMode.CMYK:
                 return _draw_cmyk_routes(
-                    cmyk_points=self.points,
-                    cmyk_factors=self.factors,
+                    cmyk_points=points,
+                    cmyk_factors=factors,
                     size=self.size,
                     line_width=self.line_width,
                     minimum_line_width_factor=minimum_line_width_factor,
@@ -507,8 +707,8 @@ class TspStudio:
                 )
             case ColorMode.RGB:
                 return _draw_rgb_routes(
-                    rgb_points=self.points,
-                    rgb_factors=self.factors,
+                    rgb_points=points,
+                    rgb_factors=factors,
                     size=self.size,
                     line_width=self.line_width,
                     minimum_line_width_factor=minimum_line_width_factor,
@@ -518,8 +718,8 @@ class TspStudio:
                 )
             case ColorMode.GRAYSCALE:
                 return _draw_route(
-                    points=self.points[0],
-                    factors=self.factors[0],
+                    points=points[0],
+                    factors=factors[0],
                     size=self.size,
                     line_width=self.line_width,
                     minimum_line_width_factor=minimum_line_width_factor,
@@ -1,4 +1,18 @@
+import math
+import os
 import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import ExitStack
+from enum import Enum
+from functools import partial
+from multiprocessing import Manager
+
+import numpy as np
+import scipy.cluster.vq
+import scipy.sparse
+import scipy.sparse.csgraph
 import scipy.spatial
 from ortools.constraint_solver import pywrapcp, routing_enums_pb2
 
@@ -7,20 +21,751 @@ from tspart._helpers import nearest_point_index as _nearest_point_index
 from tspart._helpers import map_points_to_tour as _map_points_to_tour
 
 
+def arc_costs(points, nodes):
+    """
+    Return an arc cost callback over routing indexes, computing the
+    rounded Euclidean distance between points on demand (O(n) memory
+    instead of a dense distance matrix). nodes maps every routing index
+    to its node (point index).
+    """
+
+    coordinates = [tuple(_) for _ in np.asarray(points, dtype=float).tolist()]
+    nodes = [coordinates[_] for _ in nodes]
+
+    def distance_callback(from_idx, to_idx):
+        return int(round(math.dist(nodes[from_idx], nodes[to_idx])))
+
+    return distance_callback
+
+
+class Solver(Enum):
+    ORTOOLS = "ortools"
+    LOCAL_SEARCH = "local_search"
+    HILBERT = "hilbert"
+    PARTITION = "partition"
+    PORTFOLIO = "portfolio"
+
+
+# OR-tools configurations raced by portfolio_solve, a seed warm starts
+# from a Hilbert curve tour of the points randomly rotated
+PORTFOLIO = (
+    {"first_solution_strategy": "PATH_CHEAPEST_ARC", "metaheuristic": "GUIDED_LOCAL_SEARCH"},
+    {"first_solution_strategy": "PATH_CHEAPEST_ARC", "metaheuristic": "SIMULATED_ANNEALING"},
+    {"first_solution_strategy": "PATH_CHEAPEST_ARC", "metaheuristic": "TABU_SEARCH"},
+    {"first_solution_strategy": "LOCAL_CHEAPEST_INSERTION", "metaheuristic": "GUIDED_LOCAL_SEARCH"},
+    {"metaheuristic": "GUIDED_LOCAL_SEARCH", "seed": 1},
+    {"metaheuristic": "GUIDED_LOCAL_SEARCH", "seed": 2},
+)
+
+
+def path_endpoints(points):
+    """
+    Return the start and end point indexes of an open (non symmetric)
+    route: the points nearest to the middle of the top and bottom edges.
+    """
+
+    size = (_get_bounding_corners(points)[1] + 1)
+
+    h_middle = int(round(size[0] / 2))
+    start = _nearest_point_index(points, [h_middle, 0])
+    end = _nearest_point_index(points, [h_middle, size[1]])
+
+    return start, end
+
+
+def tour_length(points, tour, closed=True):
+    points = np.asarray(points, dtype=float)[tour]
+    if closed:
+        points = np.concatenate([points, points[:1]])
+
+    return float(np.hypot(*np.diff(points, axis=0).T).sum())
+
+
+def delaunay_edges(points):
+    """
+    Return the unique edges (pairs of point indexes, lowest first) of the
+    Delaunay triangulation of the points.
+    """
+
+    simplices = scipy.spatial.Delaunay(points).simplices
+    edges = np.concatenate([simplices[:, [0, 1]], simplices[:, [1, 2]], simplices[:, [2, 0]]])
+    return np.unique(np.sort(edges, axis=1), axis=0)
+
+
+def held_karp_estimate(points, symmetric=True, iterations=100, upper_bound=None):
+    """
+    Return an estimate from below of the length of the shortest tour
+    through the points (or open route between the path_endpoints, when
+    not symmetric).
+
+    This is the Held-Karp 1-tree bound (a minimum spanning tree of all
+    the points but the first, plus its two shortest edges) over the
+    Delaunay edges, computed with scipy.sparse.csgraph, raised by
+    iterations of subgradient ascent on the node penalties. upper_bound
+    (a tour length, a greedy tour by default) scales the ascent steps.
+
+    With iterations=0 it is a strict lower bound. With penalties, the
+    1-trees are restricted to the Delaunay edges, which makes it a tight
+    estimate (typically within 1% below the optimum) rather than a strict
+    bound, so gaps to it are estimates too.
+    """
+
+    # Duplicate points are free to visit, and would be left out of the triangulation
+    points = np.unique(np.asarray(points, dtype=float), axis=0)
+    n = len(points)
+    if n < 4:
+        return tour_length(points, np.arange(n), closed=symmetric)
+
+    edges = delaunay_edges(points)
+    lengths = np.hypot(*(points[edges[:, 0]] - points[edges[:, 1]]).T)
+    if not symmetric:
+        # An open route is a tour closed by a free edge between its ends
+        edges = np.concatenate([edges, [sorted(path_endpoints(points))]])
+        lengths = np.append(lengths, 0.0)
+    if upper_bound is None and iterations > 0:
+        upper_bound = tour_length(points, improve_tour(points, greedy_tour(points)), closed=True)
+
+    # The 1-tree special node is 0, the spanning tree covers the other nodes
+    special = edges[:, 0] == 0
+    I, J = edges[~special, 0] - 1, edges[~special, 1] - 1
+    special_others = edges[special, 1]
+
+    penalties = np.zeros(n)
+    direction = np.zeros(n)
+    best = 0.0
+    step_scale = 1.0
+    since_best = 0
+    for iteration in range(iterations + 1):
+        weights = lengths + penalties[edges[:, 0]] + penalties[edges[:, 1]]
+        tree_weights = weights[~special]
+        # csgraph drops zero weights, shift them all (every spanning tree has n - 2 edges)
+        shift = 1.0 - min(0.0, tree_weights.min())
+        graph = scipy.sparse.coo_matrix((tree_weights + shift, (I, J)), shape=(n - 1, n - 1))
+        tree = scipy.sparse.csgraph.minimum_spanning_tree(graph).tocoo()
+        special_weights = weights[special]
+        nearest = np.argsort(special_weights)[:2]
+
+        value = tree.data.sum() - shift * (n - 2) + special_weights[nearest].sum() - 2 * penalties.sum()
+        if value > best + 1e-9:
+            best, since_best = value, 0
+        else:
+            since_best += 1
+            if since_best >= 5:
+                step_scale, since_best = step_scale / 2, 0
+
+        degrees = np.bincount(np.concatenate([tree.row, tree.col]) + 1, minlength=n)
+        degrees[0] = 2
+        np.add.at(degrees, special_others[nearest], 1)
+        subgradient = degrees - 2
+        if iteration == iterations or not subgradient.any():
+            break
+        # Smoothed subgradient direction (Volgenant & Jonker)
+        direction = 0.7 * subgradient + 0.3 * direction
+        penalties += step_scale * max(upper_bound - value, 0) / float((direction ** 2).sum()) * direction
+
+    return float(best)
+
+
+def candidate_arcs(points, neighbors=10, tour=None, closed=True):
+    """
+    Return the candidate neighbors of every point (list of index arrays):
+    its Delaunay neighbors, its k nearest neighbors and, with tour (point
+    indexes), its neighbors along it (closing edge included when closed),
+    so that tour stays feasible. The arcs are symmetric.
+    """
+
+    points = np.asarray(points, dtype=float)
+    n = len(points)
+    k = min(neighbors + 1, n)
+    _, nearest = scipy.spatial.KDTree(points).query(points, k=k)
+    edges = [np.stack([np.repeat(np.arange(n), k), nearest.ravel()], axis=1)]
+    if n >= 4:
+        edges.append(delaunay_edges(points))
+    if tour is not None:
+        tour = np.asarray(tour)
+        following = np.roll(tour, -1) if closed else tour[1:]
+        edges.append(np.stack([tour[:len(following)], following], axis=1))
+
+    edges = np.concatenate(edges)
+    edges = np.concatenate([edges, edges[:, ::-1]])
+    edges = np.unique(edges[edges[:, 0] != edges[:, 1]], axis=0)
+    return np.split(edges[:, 1], np.searchsorted(edges[:, 0], np.arange(1, n)))
+
+
+def tour_gap(route_length, bound):
+    # Percentage of a route length above a lower bound (or estimate)
+    return 100 * (route_length - bound) / bound
+
+
+def hilbert_tour(points, order=16):
+    """
+    Return a tour (point indexes) visiting the points along a Hilbert
+    curve of the given order spanning their bounding square. This is
+    instant, and about 25% longer than a good tour on even stipples.
+    """
+
+    points = np.asarray(points, dtype=float)
+    low = points.min(axis=0)
+    extent = float((points.max(axis=0) - low).max()) or 1.0
+    side = 2 ** order
+    x, y = ((points - low) / extent * (side - 1)).round().astype(np.int64).T
+
+    # Vectorized xy2d, see https://en.wikipedia.org/wiki/Hilbert_curve
+    d = np.zeros(len(points), dtype=np.int64)
+    s = side // 2
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((3 * rx.astype(np.int64)) ^ ry.astype(np.int64))
+        flip = rx & ~ry
+        x = np.where(flip, side - 1 - x, x)
+        y = np.where(flip, side - 1 - y, y)
+        x, y = np.where(ry, x, y), np.where(ry, y, x)
+        s //= 2
+
+    return np.argsort(d, kind="stable")
+
+
+def hilbert_solve(points, symmetric=True):
+    """
+    Draft solve along a Hilbert curve (see hilbert_tour), e.g. for
+    previews. When not symmetric, the route starts and ends at the
+    path_endpoints.
+    """
+
+    points = np.asarray(points)
+    tour = hilbert_tour(points)
+    if not symmetric:
+        start, end = path_endpoints(points)
+        tour = np.concatenate([[start], tour[(tour != start) & (tour != end)], [end]])
+
+    return _map_points_to_tour(points, tour)
+
+
+def route_to_tour(points, route):
+    """
+    Return the tour (point indexes) visiting points in the order of
+    route, a solve result (e.g. from NEOS) holding the same points.
+    """
+
+    _, tour = scipy.spatial.KDTree(points).query(route)
+    return tour
+
+
+def greedy_tour(points, neighbors=10, fixed=None):
+    """
+    Return a tour (point indexes) built by greedy edge matching: the
+    k nearest neighbor edges (KD-tree) are added shortest first, as long
+    as no point gets more than 2 edges and no subtour is closed. The
+    remaining fragments are then chained nearest endpoint first.
+
+    fixed optionally gives an edge (pair of point indexes) to force into
+    the tour, e.g. to join the ends of an open route.
+    """
+
+    points = np.asarray(points, dtype=float)
+    n = len(points)
+    if n < 3:
+        return np.arange(n)
+
+    k = min(neighbors + 1, n)
+    distances, indices = scipy.spatial.KDTree(points).query(points, k=k)
+    I = np.repeat(np.arange(n), k - 1)
+    J = indices[:, 1:].ravel()
+    D = distances[:, 1:].ravel()
+    unique = I < J
+    order = np.argsort(D[unique], kind="stable")
+    edges = np.stack([I[unique][order], J[unique][order]], axis=1).tolist()
+    if fixed is not None:
+        edges.insert(0, [int(_) for _ in fixed])
+
+    # Greedy matching, with a union-find to reject subtours
+    degree = [0] * n
+    parent = list(range(n))
+    adjacency = [[] for _ in range(n)]
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    joined = 0
+    for i, j in edges:
+        if degree[i] < 2 and degree[j] < 2:
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[root_i] = root_j
+                degree[i] += 1
+                degree[j] += 1
+                adjacency[i].append(j)
+                adjacency[j].append(i)
+                joined += 1
+                if joined == n - 1:
+                    break
+
+    # Walk every fragment from one of its ends
+    def walk(start):
+        path = [start]
+        previous, current = -1, start
+        while True:
+            following = [_ for _ in adjacency[current] if _ != previous]
+            if not following:
+                return path
+            previous, current = current, following[0]
+            path.append(current)
+
+    ends = [_ for _ in range(n) if degree[_] < 2]
+    fragments = []
+    other_end = {}
+    for end in ends:
+        if end not in other_end:
+            path = walk(end)
+            fragments.append(path)
+            other_end[path[0]] = len(fragments) - 1
+            other_end[path[-1]] = len(fragments) - 1
+
+    # Chain the fragments, nearest free endpoint first
+    ends = np.array(ends)
+    tree = scipy.spatial.KDTree(points[ends])
+    used = np.zeros(len(fragments), dtype=bool)
+    tour = []
+    current = fragments[0][0]
+    for _ in range(len(fragments)):
+        fragment = other_end[current]
+        path = fragments[fragment]
+        if path[0] != current:
+            path = path[::-1]
+        tour.extend(path)
+        used[fragment] = True
+        if used.all():
+            break
+
+        count = 8
+        while True:
+            _, nearest = tree.query(points[path[-1]], k=min(count, len(ends)))
+            free = [ends[_] for _ in np.atleast_1d(nearest) if not used[other_end[ends[_]]]]
+            if free:
+                current = free[0]
+                break
+            if count >= len(ends):
+                raise RuntimeError("No free fragment left")
+            count *= 4
+
+    return np.array(tour)
+
+
+def improve_tour(points, tour, neighbors=8, fixed=None, active=None, time_limit_minutes=None, logging=False):
+    """
+    Improve a tour (point indexes) with 2-opt and Or-opt (moving segments
+    of up to 3 points, reversed or not) moves until no improving move is
+    left or time_limit_minutes runs out. Moves are only searched between
+    the k nearest neighbors of every point, and points whose neighborhood
+    did not change since they last failed to improve are skipped (don't
+    look bits).
+
+    fixed optionally gives an edge (pair of point indexes) that is never
+    removed, e.g. the virtual edge joining the ends of an open route.
+
+    active optionally gives the point indexes to search from at first
+    (e.g. around a change), instead of all of them.
+    """
+
+    points = np.asarray(points, dtype=float)
+    n = len(points)
+    if n < 5:
+        return np.array(tour)
+
+    X, Y = points[:, 0].tolist(), points[:, 1].tolist()
+    hypot = math.hypot
+
+    def dist(i, j):
+        return hypot(X[i] - X[j], Y[i] - Y[j])
+
+    # Nearest neighbors but the point itself (which duplicate points may not list first)
+    k = min(neighbors + 1, n)
+    _, candidates = scipy.spatial.KDTree(points).query(points, k=k)
+    candidates = [[_ for _ in row if _ != i][:k - 1] for i, row in enumerate(candidates.tolist())]
+
+    tour = [int(_) for _ in tour]
+    position = [0] * n
+    for i, node in enumerate(tour):
+        position[node] = i
+
+    fixed_start, fixed_end = (-1, -1) if fixed is None else (int(fixed[0]), int(fixed[1]))
+
+    def is_fixed(i, j):
+        return (i == fixed_start and j == fixed_end) or (i == fixed_end and j == fixed_start)
+
+    def following(i):
+        return tour[position[i] + 1] if position[i] + 1 < n else tour[0]
+
+    def preceding(i):
+        return tour[position[i] - 1]
+
+    def replace(start, values):
+        # Write values over the tour from position start on (cyclic)
+        end = start + len(values)
+        if end <= n:
+            tour[start:end] = values
+        else:
+            tour[start:] = values[:n - start]
+            tour[:end - n] = values[n - start:]
+        for i, node in enumerate(values, start):
+            position[node] = i if i < n else i - n
+
+    def span(first, last):
+        # The nodes from first to last, following the tour (cyclic)
+        start, end = position[first], position[last]
+        if start <= end:
+            return tour[start:end + 1]
+        return tour[start:] + tour[:end + 1]
+
+    def reverse(first, last):
+        # Reverse the path from first to last, or its (shorter) complement
+        length = (position[last] - position[first]) % n + 1
+        if 2 * length > n:
+            first, last = following(last), preceding(first)
+        nodes = span(first, last)
+        nodes.reverse()
+        replace(position[first], nodes)
+
+    def two_opt(a):
+        for forward in (True, False):
+            b = following(a) if forward else preceding(a)
+            if is_fixed(a, b):
+                continue
+            d_ab = dist(a, b)
+            for c in candidates[a]:
+                d_ac = dist(a, c)
+                if d_ac >= d_ab:
+                    break
+                d = following(c) if forward else preceding(c)
+                if c == b or d == a or is_fixed(c, d):
+                    continue
+                delta = d_ac + dist(b, d) - d_ab - dist(c, d)
+                if delta < -1e-9:
+                    if forward:
+                        reverse(b, c)
+                    else:
+                        reverse(c, b)
+                    return (a, b, c, d)
+        return None
+
+    def or_opt(a):
+        for length in (1, 2, 3):
+            # Segment from a to last, between before and after
+            last = tour[(position[a] + length - 1) % n]
+            before, after = preceding(a), following(last)
+            if after == before or after == a:
+                return None
+            if is_fixed(before, a) or is_fixed(last, after):
+                continue
+            segment = span(a, last)
+            removal = dist(before, a) + dist(last, after) - dist(before, after)
+            for end in (a, last):
+                for c in candidates[end]:
+                    if dist(end, c) >= removal:
+                        break
+                    if c in segment:
+                        continue
+                    for u, v in ((c, following(c)), (preceding(c), c)):
+                        if v in segment or u in segment or is_fixed(u, v):
+                            continue
+                        d_uv = dist(u, v)
+                        kept = dist(u, a) + dist(last, v) - d_uv
+                        flipped = dist(u, last) + dist(a, v) - d_uv
+                        if min(kept, flipped) - removal < -1e-9:
+                            moved = segment if kept <= flipped else segment[::-1]
+                            # Either rotate [segment][after .. u] into [after .. u][moved]
+                            # or [v .. before][segment] into [moved][v .. before]
+                            middle = (position[u] - position[after]) % n + 1
+                            if 2 * middle <= n:
+                                replace(position[a], span(after, u) + moved)
+                            else:
+                                replace(position[v], moved + span(v, before))
+                            return (before, a, last, after, u, v)
+        return None
+
+    deadline = None if time_limit_minutes is None else time.time() + time_limit_minutes * 60
+    region = None if active is None else {int(_) for _ in active}
+    queued = [False] * n
+    moves = 0
+    timed_out = False
+    while not timed_out:
+        # Reversals change the moves of points whose neighbors did not change, so search again until a pass
+        # (over all the points, or the active ones and those moved since) finds no move
+        queue = deque(tour if region is None else sorted(region))
+        for node in queue:
+            queued[node] = True
+        pass_moves = moves
+        while queue:
+            if deadline is not None and moves % 256 == 0 and time.time() > deadline:
+                timed_out = True
+                break
+            a = queue.popleft()
+            queued[a] = False
+            touched = two_opt(a) or or_opt(a)
+            if touched:
+                moves += 1
+                if region is not None:
+                    region.update(touched)
+                for node in touched:
+                    if not queued[node]:
+                        queued[node] = True
+                        queue.append(node)
+        if moves == pass_moves:
+            break
+
+    if logging:
+        print(f"Local search: {moves} improving moves", file=sys.stderr)
+
+    return np.array(tour)
+
+
+def _open_tour(tour, fixed):
+    # Open a tour at its fixed edge, from start to end
+    if fixed is None:
+        return tour
+    start, end = fixed
+    tour = np.roll(tour, -int(np.flatnonzero(tour == start)[0]))
+    if tour[1] == end:
+        tour = np.roll(tour[::-1], 1)
+    return tour
+
+
+def local_search_solve(
+        points,
+        time_limit_minutes=None,
+        symmetric=True,
+        neighbors=8,
+        endpoints=None,
+        return_tour=False,
+        solution_callback=None,
+        logging=True
+):
+    """
+    Solve with the built-in Euclidean engine: a greedy edge tour refined
+    with 2-opt and Or-opt over k nearest neighbor candidates (see
+    greedy_tour and improve_tour), without OR-tools.
+
+    Return the points in tour order (the closing edge is implied), or
+    from the top middle to the bottom middle point when not symmetric
+    (endpoints optionally gives other start and end point indexes). With
+    return_tour, return the point indexes instead.
+
+    solution_callback is called with the greedy and the improved tours
+    (point indexes), their length and the time.time() they were found at.
+    """
+
+    points = np.asarray(points)
+    fixed = None
+    if not symmetric:
+        fixed = path_endpoints(points) if endpoints is None else endpoints
+
+    start_time = time.time()
+    tour = greedy_tour(points, neighbors=max(neighbors, 10), fixed=fixed)
+    if logging:
+        print(f"Greedy tour: {tour_length(points, tour):.0f} ({time.time() - start_time:.1f}s)", file=sys.stderr)
+    if solution_callback is not None:
+        solution_callback(_open_tour(tour, fixed), tour_length(points, tour), time.time())
+
+    if time_limit_minutes is not None:
+        time_limit_minutes = max(0, time_limit_minutes - (time.time() - start_time) / 60)
+    tour = improve_tour(points, tour, neighbors=neighbors, fixed=fixed,
+                        time_limit_minutes=time_limit_minutes, logging=logging)
+    if logging:
+        print(f"Improved tour: {tour_length(points, tour):.0f} ({time.time() - start_time:.1f}s)", file=sys.stderr)
+    tour = _open_tour(tour, fixed)
+    if solution_callback is not None:
+        solution_callback(tour, tour_length(points, tour), time.time())
+
+    if return_tour:
+        return tour
+
+    return _map_points_to_tour(points, tour)
+
+
+def repair_tour(
+        points,
+        route,
+        symmetric=True,
+        tolerance=None,
+        neighbors=8,
+        return_tour=False,
+        logging=True
+):
+    """
+    Reuse route (a previous solve result) for points, a slightly changed
+    version of its point set, e.g. after more stipple iterations or a
+    white threshold change, instead of solving from scratch.
+
+    Points within tolerance of a route point (by default, the median
+    route edge length) take its place in the route, the other route
+    points are deleted, and the new points are added by cheapest
+    insertion between nearby points (KD-tree). The changed parts of the
+    tour are then improved with 2-opt and Or-opt (see improve_tour).
+    When not symmetric, the route goes between the path_endpoints.
+    """
+
+    points = np.asarray(points, dtype=float)
+    route = np.asarray(route, dtype=float)
+    n = len(points)
+    if symmetric and len(route) > 1 and (route[0] == route[-1]).all():
+        route = route[:-1]
+    if tolerance is None:
+        tolerance = float(np.median(np.hypot(*np.diff(route, axis=0).T))) if len(route) > 1 else 0
+
+    # Match every route point to its closest new point within tolerance, keeping its route position
+    distances, nearest = scipy.spatial.KDTree(route).query(points, distance_upper_bound=tolerance)
+    order = np.argsort(distances, kind="stable")
+    order = order[np.isfinite(distances[order])]
+    _, first = np.unique(nearest[order], return_index=True)
+    matched = order[first]
+
+    fixed = None
+    kept = matched
+    if not symmetric:
+        fixed = path_endpoints(points)
+        kept = np.concatenate([[fixed[0]], kept[(kept != fixed[0]) & (kept != fixed[1])], [fixed[1]]])
+    if len(kept) < 3:
+        return local_search_solve(points, symmetric=symmetric, neighbors=neighbors,
+                                  return_tour=return_tour, logging=logging)
+
+    # Tour as a linked list, to insert the unmatched points
+    following, preceding = np.full(n, -1), np.full(n, -1)
+    following[kept], preceding[kept] = np.roll(kept, -1), np.roll(kept, 1)
+    in_tour = following >= 0
+    inserted = np.flatnonzero(~in_tour)
+
+    # Route neighbors of deleted points were joined by a new edge
+    deleted = np.ones(len(route), dtype=bool)
+    deleted[nearest[matched]] = False
+    splices = np.flatnonzero(np.roll(deleted, 1) | np.roll(deleted, -1))
+    active = set(matched[np.isin(nearest[matched], splices)].tolist())
+    active.update(matched[distances[matched] > tolerance / 2].tolist())
+
+    def dist(i, j):
+        return math.hypot(points[i, 0] - points[j, 0], points[i, 1] - points[j, 1])
+
+    tree = scipy.spatial.KDTree(points)
+    k = min(neighbors * 2, n)
+    for node in inserted.tolist():
+        candidates = [_ for _ in np.atleast_1d(tree.query(points[node], k=k)[1]).tolist() if in_tour[_]]
+        if not candidates:
+            members = np.flatnonzero(in_tour)
+            candidates = [int(members[np.argmin(np.hypot(*(points[members] - points[node]).T))])]
+
+        best, best_cost = None, math.inf
+        for c in candidates:
+            for a, b in ((c, following[c]), (preceding[c], c)):
+                if fixed is not None and a == fixed[1] and b == fixed[0]:
+                    continue
+                cost = dist(a, node) + dist(node, b) - dist(a, b)
+                if cost < best_cost:
+                    best, best_cost = (a, b), cost
+
+        a, b = best
+        following[a], preceding[node], following[node], preceding[b] = node, a, b, node
+        in_tour[node] = True
+        active.update((a, node, b))
+
+    tour = [int(kept[0])]
+    for _ in range(n - 1):
+        tour.append(int(following[tour[-1]]))
+    tour = np.array(tour)
+
+    if logging:
+        print(f"Repaired tour: kept {len(matched)}, deleted {int(deleted.sum())}, inserted {len(inserted)} points, "
+              f"{tour_length(points, tour, closed=symmetric):.0f}", file=sys.stderr)
+
+    tour = improve_tour(points, tour, neighbors=neighbors, fixed=fixed, active=sorted(active))
+    tour = _open_tour(tour, fixed)
+    if logging:
+        print(f"Improved tour: {tour_length(points, tour, closed=symmetric):.0f}", file=sys.stderr)
+
+    if return_tour:
+        return tour
+
+    return _map_points_to_tour(points, tour)
+
+
 # See https://developers.google.com/optimization/routing/tsp
-def heuristic_solve(points, time_limit_minutes=60, symmetric=True, logging=True, verbose=False):
-    distance_matrix = scipy.spatial.distance.cdist(points, points).round().astype(int)
+def heuristic_solve(
+        points,
+        time_limit_minutes=60,
+        symmetric=True,
+        initial_tour=None,
+        endpoints=None,
+        return_tour=False,
+        first_solution_strategy="PATH_CHEAPEST_ARC",
+        metaheuristic="GUIDED_LOCAL_SEARCH",
+        solution_callback=None,
+        gap=None,
+        bound=None,
+        candidate_neighbors=None,
+        cache=None,
+        reuse_cached=False,
+        logging=True,
+        verbose=False
+):
+    """
+    Solve with OR-tools guided local search (first_solution_strategy and
+    metaheuristic name other OR-tools FirstSolutionStrategy and
+    LocalSearchMetaheuristic values). With initial_tour (point
+    indexes, e.g. from hilbert_tour, route_to_tour or a previous solve),
+    the search starts from it instead of building a first solution with
+    PATH_CHEAPEST_ARC.
+
+    When not symmetric, endpoints optionally gives the start and end
+    point indexes instead of path_endpoints. With return_tour, return the
+    point indexes instead of the points.
+
+    solution_callback is called with every improving tour found during the
+    search (point indexes, each visited once), its cost and the time.time()
+    it was found at, e.g. to checkpoint long solves.
+
+    With gap (percentage), the search stops as soon as the length of the
+    tour is within gap of bound, an estimate from below of the optimum
+    (see held_karp_estimate, computed when not given), instead of only at
+    the time limit.
+
+    With candidate_neighbors (k), the successors of every point are
+    restricted to its candidate_arcs (Delaunay edges and k nearest
+    neighbors), so the search only evaluates short arcs. The arcs of the
+    initial tour are kept too, a local search tour being used as the
+    initial tour when none is given.
+
+    With cache (a TourCache), the search starts from the cached tour of
+    the points (when no initial_tour is given), and the solved tour is
+    cached. With reuse_cached, the cached tour is returned without
+    solving instead.
+    """
+
     num_points = len(points)
 
+    if not symmetric:
+        endpoints = path_endpoints(points) if endpoints is None else endpoints
+
+    tour = None if cache is None else cache.get(points, symmetric=symmetric, endpoints=endpoints)
+    if tour is not None and reuse_cached:
+        if logging:
+            print("Using a cached tour", file=sys.stderr)
+        if symmetric:
+            tour = np.roll(tour, -int(np.flatnonzero(tour == 0)[0]))
+            tour = np.append(tour, tour[0])
+        if return_tour:
+            return tour
+        return _map_points_to_tour(points, tour)
+    if tour is not None and initial_tour is None:
+        if logging:
+            print("Starting from a cached tour", file=sys.stderr)
+        initial_tour = tour
+
     if symmetric:
         manager = pywrapcp.RoutingIndexManager(num_points, 1, 0)
     else:
-        size = (_get_bounding_corners(points)[1] + 1)
-
-        h_middle = int(round(size[0] / 2))
-        start = _nearest_point_index(points, [h_middle, 0])
-        end = _nearest_point_index(points, [h_middle, size[1]])
-
+        start, end = endpoints
         manager = pywrapcp.RoutingIndexManager(num_points, 1, [start], [end])
 
     routing_parameters = pywrapcp.DefaultRoutingModelParameters()
@@ -30,28 +775,88 @@ def heuristic_solve(points, time_limit_minutes=60, symmetric=True, logging=True,
 
     routing = pywrapcp.RoutingModel(manager, routing_parameters)
 
-    def distance_callback(from_idx, to_idx):
-        from_node = manager.IndexToNode(from_idx)
-        to_node = manager.IndexToNode(to_idx)
-        return distance_matrix[from_node][to_node]
+    distance_callback = arc_costs(points, [manager.IndexToNode(_) for _ in range(routing.Size() + routing.vehicles())])
     transit_callback_index = routing.RegisterTransitCallback(distance_callback)
 
     routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
 
+    if candidate_neighbors is not None:
+        start_node, end_node = manager.IndexToNode(routing.Start(0)), manager.IndexToNode(routing.End(0))
+        if initial_tour is None:
+            initial_tour = local_search_solve(
+                points, symmetric=symmetric, endpoints=None if symmetric else (start_node, end_node),
+                return_tour=True, logging=False
+            )
+        successors = candidate_arcs(points, candidate_neighbors, initial_tour, closed=symmetric)
+
+        # Arcs into the end node go to the end index, none go back to the start
+        for index in range(routing.Size()):
+            node = manager.IndexToNode(index)
+            values = {
+                routing.End(0) if _ == end_node else manager.NodeToIndex(int(_))
+                for _ in successors[node] if _ == end_node or _ != start_node
+            }
+            routing.NextVar(index).SetValues(sorted(values))
+
     search_parameters = pywrapcp.DefaultRoutingSearchParameters()
     search_parameters.first_solution_strategy = (
-        routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
+        getattr(routing_enums_pb2.FirstSolutionStrategy, first_solution_strategy)
     )
 
     search_parameters.local_search_metaheuristic = (
-        routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH)
+        getattr(routing_enums_pb2.LocalSearchMetaheuristic, metaheuristic))
     if time_limit_minutes:
         search_parameters.time_limit.seconds = int(round(time_limit_minutes * 60))
 
     if logging:
         search_parameters.log_search = True
 
-    solution = routing.SolveWithParameters(search_parameters)
+    if gap is not None and bound is None:
+        bound = held_karp_estimate(points, symmetric=symmetric)
+
+    if solution_callback is not None or gap is not None:
+        best_cost = None
+
+        def publish():
+            nonlocal best_cost
+            cost = routing.CostVar().Value()
+            if best_cost is not None and cost >= best_cost:
+                return
+            best_cost = cost
+
+            index = routing.Start(0)
+            tour = [manager.IndexToNode(index)]
+            while True:
+                index = routing.NextVar(index).Value()
+                if routing.IsEnd(index):
+                    break
+                tour.append(manager.IndexToNode(index))
+            if not symmetric:
+                tour.append(manager.IndexToNode(index))
+            if solution_callback is not None:
+                solution_callback(np.array(tour), cost, time.time())
+
+            if gap is not None:
+                reached = tour_gap(tour_length(points, tour, closed=symmetric), bound)
+                if reached <= gap:
+                    if logging:
+                        print(f"Reached a {reached:.2f}% gap to the Held-Karp estimate", file=sys.stderr)
+                    routing.solver().FinishCurrentSearch()
+        routing.AddAtSolutionCallback(publish)
+
+    if initial_tour is None:
+        solution = routing.SolveWithParameters(search_parameters)
+    else:
+        # The route given to OR-tools excludes the start and end nodes
+        routing.CloseModelWithParameters(search_parameters)
+        start_node = manager.IndexToNode(routing.Start(0))
+        ends = {start_node, manager.IndexToNode(routing.End(0))}
+        initial_tour = np.roll(initial_tour, -int(np.flatnonzero(np.asarray(initial_tour) == start_node)[0]))
+        route = [manager.NodeToIndex(int(_)) for _ in initial_tour if _ not in ends]
+        initial_solution = routing.ReadAssignmentFromRoutes([route], True)
+        if initial_solution is None:
+            raise ValueError("Invalid initial tour")
+        solution = routing.SolveFromAssignmentWithParameters(initial_solution, search_parameters)
 
     if solution:
         index = routing.Start(0)
@@ -61,6 +866,12 @@ def heuristic_solve(points, time_limit_minutes=60, symmetric=True, logging=True,
             index = solution.Value(routing.NextVar(index))
             tour.append(manager.IndexToNode(index))
 
+        if cache is not None:
+            cache.put(points, tour, symmetric=symmetric, endpoints=endpoints)
+
+        if return_tour:
+            return np.array(tour)
+
         route = _map_points_to_tour(points, tour)
 
         return route
@@ -68,18 +879,470 @@ def heuristic_solve(points, time_limit_minutes=60, symmetric=True, logging=True,
         return None
 
 
-def heuristic_solves(points_list, time_limit_minutes=60, symmetric=True, logging=True, verbose=False):
-    result = []
-    for idx, points in enumerate(points_list):
-        print(f"Solving image {idx + 1}/{len(points_list)}", file=sys.stderr)
-        r = heuristic_solve(
-            points=points,
-            time_limit_minutes=time_limit_minutes,
-            symmetric=symmetric,
-            logging=logging,
-            verbose=verbose
-        )
+def _solve_cluster(points, endpoints, solver, time_limit_minutes):
+    # Open path through one cluster, from its entry to its exit point
+    start, end = endpoints
+    if len(points) <= 3:
+        middle = [_ for _ in range(len(points)) if _ not in endpoints]
+        return np.array([start] + middle + ([end] if end != start else []))
+
+    match solver:
+        case Solver.ORTOOLS:
+            return heuristic_solve(points, time_limit_minutes, symmetric=False, endpoints=endpoints,
+                                   return_tour=True, logging=False)
+        case Solver.LOCAL_SEARCH:
+            return local_search_solve(points, time_limit_minutes, symmetric=False, endpoints=endpoints,
+                                      return_tour=True, logging=False)
+
+
+def _junction(points_a, points_b, excluded_a, excluded_b):
+    # Closest pair of points between two clusters, avoiding the excluded indexes
+    k = min(3, len(points_b))
+    distances, indices = scipy.spatial.KDTree(points_b).query(points_a, k=k)
+    distances, indices = distances.reshape(len(points_a), k), indices.reshape(len(points_a), k)
+    for flat in np.argsort(distances, axis=None, kind="stable"):
+        a, b = divmod(int(flat), k)
+        b = int(indices[a, b])
+        if (a != excluded_a or len(points_a) == 1) and (b != excluded_b or len(points_b) == 1):
+            return a, b
+    raise RuntimeError("No junction found between clusters")
+
+
+def partition_solve(
+        points,
+        time_limit_minutes=60,
+        symmetric=True,
+        cluster_size=5000,
+        cluster_solver=Solver.ORTOOLS,
+        workers=1,
+        logging=True
+):
+    """
+    Divide and conquer solve for large point sets. The points are split
+    into clusters of about cluster_size points (k-means), the clusters are
+    ordered by a small tour over their centroids, and every cluster is
+    solved as an open path with cluster_solver (in a process pool with
+    workers other than 1), entering and leaving through the closest points
+    to its neighbors. The paths are stitched together and the seams are
+    repaired with 2-opt and Or-opt (see improve_tour).
+
+    time_limit_minutes is the wall clock budget shared by all the cluster
+    solves.
+    """
+
+    cluster_solver = Solver(cluster_solver)
+    if cluster_solver not in (Solver.ORTOOLS, Solver.LOCAL_SEARCH):
+        raise ValueError(f"Unsupported cluster solver: {cluster_solver.value}")
+    points = np.asarray(points, dtype=float)
+    n = len(points)
+    clusters = int(np.ceil(n / cluster_size))
+    if clusters < 2:
+        match cluster_solver:
+            case Solver.ORTOOLS:
+                return heuristic_solve(points, time_limit_minutes, symmetric, logging=logging)
+            case Solver.LOCAL_SEARCH:
+                return local_search_solve(points, time_limit_minutes, symmetric, logging=logging)
+
+    start_time = time.time()
+    _, labels = scipy.cluster.vq.kmeans2(points, clusters, minit="++")
+    labels = np.unique(labels, return_inverse=True)[1]
+    members = [np.flatnonzero(labels == _) for _ in range(labels.max() + 1)]
+    centroids = np.array([points[_].mean(axis=0) for _ in members])
+
+    # Order the clusters, an open route runs from the start to the end clusters
+    fixed = None
+    if not symmetric:
+        start, end = path_endpoints(points)
+        fixed = (labels[start], labels[end])
+        if fixed[0] == fixed[1]:
+            raise ValueError("The route ends fall in the same cluster, try a smaller cluster_size")
+    order = local_search_solve(centroids, symmetric=symmetric, endpoints=fixed, return_tour=True, logging=False)
+    if symmetric:
+        order = np.append(order, order[0])
+    members = [members[_] for _ in order]
+
+    # Entry and exit point (local indexes) of every cluster
+    entries = [None] * len(members)
+    exits = [None] * len(members)
+    if not symmetric:
+        entries[0] = int(np.flatnonzero(members[0] == start)[0])
+        exits[-1] = int(np.flatnonzero(members[-1] == end)[0])
+    for idx in range(len(members) - 1):
+        if symmetric and idx == len(members) - 2:
+            # Closing junction, back into the first cluster
+            exits[idx], entries[0] = _junction(
+                points[members[idx]], points[members[0]], entries[idx], exits[0]
+            )
+        else:
+            exits[idx], entries[idx + 1] = _junction(
+                points[members[idx]], points[members[idx + 1]], entries[idx], exits[idx + 1]
+            )
+    if symmetric:
+        members, entries, exits = members[:-1], entries[:-1], exits[:-1]
+
+    if logging:
+        print(f"Solving {len(members)} clusters ({time.time() - start_time:.1f}s)", file=sys.stderr)
+
+    # Share the time budget between the sequential waves of cluster solves
+    cluster_time = None
+    if time_limit_minutes:
+        waves = np.ceil(len(members) / (workers or os.cpu_count() or 1))
+        cluster_time = max(0.01, (time_limit_minutes - (time.time() - start_time) / 60) / waves)
+    arguments = [
+        (points[m], (entry, exit), cluster_solver, cluster_time) for m, entry, exit in zip(members, entries, exits)
+    ]
+    if workers == 1:
+        paths = [_solve_cluster(*_) for _ in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            paths = list(executor.map(_solve_cluster, *zip(*arguments)))
+
+    if any(_ is None for _ in paths):
+        return None
+    tour = np.concatenate([m[p] for m, p in zip(members, paths)])
+
+    # Repair around the seams: points with neighbors from another cluster
+    _, neighbors = scipy.spatial.KDTree(points).query(points, k=min(9, n))
+    seams = np.flatnonzero((labels[neighbors] != labels[:, np.newaxis]).any(axis=1))
+    fixed = None if symmetric else (start, end)
+    tour = _open_tour(improve_tour(points, tour, fixed=fixed, active=seams), fixed)
+    assert len(tour) == n and len(np.unique(tour)) == n, "Stitched tour is not a permutation"
+    assert symmetric or (tour[0] == start and tour[-1] == end), "Stitched route does not keep its endpoints"
+
+    if logging:
+        print(f"Stitched tour: {tour_length(points, tour, symmetric):.0f} ({time.time() - start_time:.1f}s)",
+              file=sys.stderr)
+
+    return _map_points_to_tour(points, tour)
+
+
+def _portfolio_member(points, deadline, symmetric, configuration):
+    # One portfolio configuration, running until the shared deadline
+    time_limit_minutes = (deadline - time.time()) / 60
+    if time_limit_minutes < 1 / 60:
+        return None
+
+    configuration = dict(configuration)
+    seed = configuration.pop("seed", None)
+    initial_tour = None
+    if seed is not None:
+        angle = np.random.default_rng(seed).uniform(0, 2 * np.pi)
+        rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+        initial_tour = hilbert_tour(np.asarray(points, dtype=float) @ rotation)
+
+    return heuristic_solve(points, time_limit_minutes, symmetric, initial_tour=initial_tour,
+                           return_tour=True, logging=False, **configuration)
+
+
+def portfolio_solve(
+        points,
+        time_limit_minutes=60,
+        symmetric=True,
+        configurations=PORTFOLIO,
+        workers=None,
+        return_configuration=False,
+        logging=True
+):
+    """
+    Race several OR-tools configurations (heuristic_solve keyword
+    arguments, plus an optional "seed", see PORTFOLIO) in a process pool
+    of workers processes (None for one per CPU), all stopping at the same
+    deadline, time_limit_minutes from now. Only the first workers
+    configurations run, the others could not start before the deadline.
+
+    Return the shortest route, and the configuration that found it with
+    return_configuration.
+    """
+
+    slots = workers or os.cpu_count() or 1
+    if len(configurations) > slots:
+        if logging:
+            for configuration in configurations[slots:]:
+                print(f"Portfolio {configuration}: skipped, only {slots} workers", file=sys.stderr)
+        configurations = configurations[:slots]
+
+    deadline = time.time() + time_limit_minutes * 60
+    with ProcessPoolExecutor(max_workers=slots) as executor:
+        futures = [
+            executor.submit(_portfolio_member, points, deadline, symmetric, _) for _ in configurations
+        ]
+        tours = [_.result() for _ in futures]
+
+    best, best_length = None, None
+    for configuration, tour in zip(configurations, tours):
+        if tour is None:
+            if logging:
+                print(f"Portfolio {configuration}: no solution", file=sys.stderr)
+            continue
+        length = tour_length(points, tour, closed=symmetric)
+        if logging:
+            print(f"Portfolio {configuration}: {length:.0f}", file=sys.stderr)
+        if best_length is None or length < best_length:
+            best, best_length = (configuration, tour), length
+
+    if best is None:
+        return (None, None) if return_configuration else None
+
+    configuration, tour = best
+    if logging:
+        print(f"Portfolio winner {configuration}", file=sys.stderr)
+    route = _map_points_to_tour(points, tour)
+
+    if return_configuration:
+        return route, configuration
+
+    return route
+
+
+def solve(
+        points,
+        time_limit_minutes=60,
+        symmetric=True,
+        solver=Solver.ORTOOLS,
+        initial_tour=None,
+        solution_callback=None,
+        gap=None,
+        bound=None,
+        cache=None,
+        reuse_cached=False,
+        cluster_size=5000,
+        workers=None,
+        logging=True,
+        verbose=False
+):
+    """
+    Solve one point set with the given solver (see Solver).
+
+    solution_callback receives the intermediate tours of the OR-tools and
+    local search solvers (see heuristic_solve), the others ignore it, as
+    well as gap and bound (OR-tools only).
+
+    cluster_size applies to the partition solver, and workers (processes,
+    None for one per CPU) to the partition and portfolio solvers.
+
+    With cache (a TourCache), solved tours (except Hilbert drafts) are
+    cached, and the best tour cached by any solver is returned when
+    shorter. OR-tools starts from it. With reuse_cached, a cached tour is
+    returned without solving.
+    """
+
+    solver = Solver(solver)
+    endpoints = None if symmetric else path_endpoints(points)
+    if cache is not None and reuse_cached and solver != Solver.ORTOOLS:
+        tour = cache.get(points, symmetric=symmetric, endpoints=endpoints)
+        if tour is not None:
+            if logging:
+                print("Using a cached tour", file=sys.stderr)
+            return _map_points_to_tour(points, tour)
+
+    match solver:
+        case Solver.ORTOOLS:
+            return heuristic_solve(
+                points=points,
+                time_limit_minutes=time_limit_minutes,
+                symmetric=symmetric,
+                initial_tour=initial_tour,
+                solution_callback=solution_callback,
+                gap=gap,
+                bound=bound,
+                cache=cache,
+                reuse_cached=reuse_cached,
+                logging=logging,
+                verbose=verbose
+            )
+        case Solver.LOCAL_SEARCH:
+            route = local_search_solve(
+                points=points,
+                time_limit_minutes=time_limit_minutes,
+                symmetric=symmetric,
+                solution_callback=solution_callback,
+                logging=logging
+            )
+        case Solver.HILBERT:
+            return hilbert_solve(
+                points=points,
+                symmetric=symmetric
+            )
+        case Solver.PARTITION:
+            route = partition_solve(
+                points=points,
+                time_limit_minutes=time_limit_minutes,
+                symmetric=symmetric,
+                cluster_size=cluster_size,
+                workers=workers,
+                logging=logging
+            )
+        case Solver.PORTFOLIO:
+            route = portfolio_solve(
+                points=points,
+                time_limit_minutes=time_limit_minutes,
+                symmetric=symmetric,
+                workers=workers,
+                logging=logging
+            )
+
+    if cache is not None and route is not None:
+        if not cache.put(points, route_to_tour(points, route), symmetric=symmetric, endpoints=endpoints):
+            tour = cache.get(points, symmetric=symmetric, endpoints=endpoints)
+            if tour is not None:
+                if logging:
+                    print("Using a shorter cached tour", file=sys.stderr)
+                route = _map_points_to_tour(points, tour)
+
+    return route
+
+
+def split_time_limit(time_limit_minutes, sizes, workers=1):
+    """
+    Split a global time_limit_minutes between solves of the given sizes
+    (point counts), proportionally to them. With workers concurrent
+    solves, the shares are scaled by the number of solves running at once
+    (capped to the full limit), so the wall clock time stays about the
+    same.
+    """
+
+    sizes = np.asarray(sizes, dtype=float)
+    slots = len(sizes) if workers is None else min(workers, len(sizes))
+    shares = time_limit_minutes * slots * sizes / sizes.sum()
+    return [float(_) for _ in np.minimum(shares, time_limit_minutes)]
+
+
+def _publish(queue, idx, tour, cost, timestamp):
+    # Solution callback of a process pool solve, forwarded to the parent
+    queue.put((idx, tour, cost, timestamp))
+
+
+def heuristic_solves(
+        points_list,
+        time_limit_minutes=60,
+        symmetric=True,
+        solver=Solver.ORTOOLS,
+        initial_tours=None,
+        workers=1,
+        split_time=False,
+        solution_callback=None,
+        gap=None,
+        return_gaps=False,
+        cache=None,
+        reuse_cached=False,
+        cluster_size=5000,
+        solver_workers=None,
+        logging=True,
+        verbose=False
+):
+    """
+    Solve every point set (channel) with solve.
+
+    With workers other than 1, the channels are solved concurrently in a
+    process pool of that many workers (None for one per CPU), without
+    the solver logs. With split_time, time_limit_minutes is a budget for
+    all the channels, shared by point count (see split_time_limit),
+    instead of the limit of every channel.
+
+    solution_callback is called with the channel index followed by the
+    solve callback arguments (see solve), in this process in both cases.
+
+    With gap, every channel stops once within gap percent of its
+    Held-Karp estimate (see heuristic_solve). With return_gaps, also
+    return the estimated final gap of every channel (None when unsolved),
+    the estimates then being computed here rather than by the solves.
+
+    cache (a TourCache) is shared by the channel solves (see solve), and
+    reuse_cached, cluster_size and solver_workers are their reuse_cached,
+    cluster_size and workers.
+    With concurrent channels, solver_workers=None splits the CPUs between
+    them instead of giving each one per CPU.
+    """
+
+    solver = Solver(solver)
+    if solver_workers is None and workers != 1:
+        slots = len(points_list) if workers is None else min(workers, len(points_list))
+        solver_workers = max(1, (os.cpu_count() or 1) // max(1, slots))
+    if initial_tours is None:
+        initial_tours = [None] * len(points_list)
+    time_limits = [time_limit_minutes] * len(points_list)
+    if split_time and time_limit_minutes:
+        time_limits = split_time_limit(time_limit_minutes, [len(_) for _ in points_list], workers)
+    bounds = [None] * len(points_list)
+    if return_gaps:
+        bounds = [held_karp_estimate(_, symmetric=symmetric) for _ in points_list]
+
+    def result_gaps(result):
+        return [
+            None if r is None else tour_gap(tour_length(r, np.arange(len(r)), closed=symmetric), bound)
+            for r, bound in zip(result, bounds)
+        ]
+
+    if workers == 1:
+        result = []
+        for idx, points in enumerate(points_list):
+            print(f"Solving image {idx + 1}/{len(points_list)}", file=sys.stderr)
+            r = solve(
+                points=points,
+                time_limit_minutes=time_limits[idx],
+                symmetric=symmetric,
+                solver=solver,
+                initial_tour=initial_tours[idx],
+                solution_callback=None if solution_callback is None else partial(solution_callback, idx),
+                gap=gap,
+                bound=bounds[idx],
+                cache=cache,
+                reuse_cached=reuse_cached,
+                cluster_size=cluster_size,
+                workers=solver_workers,
+                logging=logging,
+                verbose=verbose
+            )
+
+            result.append(r)
+
+        if return_gaps:
+            return result, result_gaps(result)
+
+        return result
+
+    if logging:
+        print(f"Solving {len(points_list)} images concurrently", file=sys.stderr)
+    with ExitStack() as stack:
+        executor = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+        queue = None
+        if solution_callback is not None:
+            queue = stack.enter_context(Manager()).Queue()
+
+        def forward():
+            while queue is not None and not queue.empty():
+                solution_callback(*queue.get())
+
+        futures = [
+            executor.submit(
+                solve,
+                points=points,
+                time_limit_minutes=time_limits[idx],
+                symmetric=symmetric,
+                solver=solver,
+                initial_tour=initial_tours[idx],
+                solution_callback=None if queue is None else partial(_publish, queue, idx),
+                gap=gap,
+                bound=bounds[idx],
+                cache=cache,
+                reuse_cached=reuse_cached,
+                cluster_size=cluster_size,
+                workers=solver_workers,
+                logging=False
+            )
+            for idx, points in enumerate(points_list)
+        ]
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+            forward()
+            if logging:
+                for future in done:
+                    print(f"Solved image {futures.index(future) + 1}/{len(points_list)}", file=sys.stderr)
+        forward()
+        result = [_.result() for _ in futures]
 
-        result.append(r)
+    if return_gaps:
+        return result, result_gaps(result)
 
     return result
@@ -124,6 +124,110 @@ def weighted_centroid_outline(V, P, Q):
     return [x, y]
 
 
+def rasterize_outlines(vertices, regions):
+    """
+    Batched polygon outline rasterization (scanlines).
+
+    Vectorized equivalent of calling rasterize_outline on every
+    region at once. Returns an (m,4) shaped integer array where each
+    row is (x1, x2, y, region index).
+
+    Parameters:
+    -----------
+
+    vertices : (n,2) shaped numpy array
+        Polygon vertices shared by all regions
+
+    regions : list of lists of int
+        Ordered vertex indices of each polygon
+    """
+    lengths = np.array([len(region) for region in regions], dtype=int)
+    if not len(lengths) or not lengths.sum():
+        return np.zeros((0, 4), dtype=int)
+    starts = np.cumsum(lengths) - lengths
+    flat = np.fromiter((index for region in regions for index in region), dtype=int, count=lengths.sum())
+    owner = np.repeat(np.arange(len(regions)), lengths)
+
+    # Edge i of a region joins vertex i-1 to vertex i (cyclic)
+    position = np.arange(len(flat)) - starts[owner]
+    previous = starts[owner] + (position - 1) % lengths[owner]
+    V = vertices[flat]
+    Vp = vertices[flat[previous]]
+    X1, Y1, X2, Y2 = Vp[:, 0], Vp[:, 1], V[:, 0], V[:, 1]
+
+    # Per region scanline range
+    Y_max = np.full(len(regions), -np.inf)
+    np.maximum.at(Y_max, owner, V[:, 1])
+    ymax = np.floor(Y_max).astype(int)
+
+    # Orient edges upwards and drop horizontal ones
+    swap = Y1 > Y2
+    X1, X2 = np.where(swap, X2, X1), np.where(swap, X1, X2)
+    Y1, Y2 = np.where(swap, Y2, Y1), np.where(swap, Y1, Y2)
+    keep = Y1 != Y2
+    X1, Y1, X2, Y2, owner = X1[keep], Y1[keep], X2[keep], Y2[keep], owner[keep]
+
+    # Scanlines y with y1 <= y < y2, plus y == ymax when y1 < y <= y2
+    first = np.ceil(Y1).astype(int)
+    count = np.maximum(np.ceil(Y2).astype(int) - first, 0)
+    extra = (Y2 == ymax[owner]) & (Y1 < Y2)
+    count += extra
+    edge = np.repeat(np.arange(len(owner)), count)
+    Y = first[edge] + np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+    X = (Y - Y1[edge]) * (X2[edge] - X1[edge]) / (Y2[edge] - Y1[edge]) + X1[edge]
+    region = owner[edge]
+
+    # Pair up sorted crossings of each (region, scanline)
+    order = np.lexsort((X, Y, region))
+    X, Y, region = X[order], Y[order], region[order]
+    new_group = np.ones(len(X), dtype=bool)
+    new_group[1:] = (region[1:] != region[:-1]) | (Y[1:] != Y[:-1])
+    group_start = np.flatnonzero(new_group)
+    rank = np.arange(len(X)) - np.repeat(group_start, np.diff(np.append(group_start, len(X))))
+    left = np.flatnonzero(rank % 2 == 0)
+    left = left[left + 1 < len(X)]
+    left = left[~new_group[left + 1]]
+
+    points = np.empty((len(left), 4), dtype=int)
+    points[:, 0] = np.ceil(X[left])
+    points[:, 1] = np.ceil(X[left + 1])
+    points[:, 2] = Y[left]
+    points[:, 3] = region[left]
+    return points
+
+
+def weighted_centroids_outline(vertices, regions, P, Q, return_weights=False):
+    """
+    Given shared vertices and a list of polygons (ordered vertex
+    indices), return the surface weighted centroid of every polygon
+    according to density P & Q, as an (len(regions),2) shaped array.
+    With return_weights, also return the density mass of every polygon.
+
+    This is the batched equivalent of weighted_centroid_outline: all
+    the outlines are rasterized together and reduced per region.
+    """
+
+    O = rasterize_outlines(vertices, regions)
+    X1, X2, Y, R = O[:, 0], O[:, 1], O[:, 2], O[:, 3]
+
+    Y = np.minimum(Y, P.shape[0] - 1)
+    X1 = np.minimum(X1, P.shape[1] - 1)
+    X2 = np.minimum(X2, P.shape[1] - 1)
+
+    P1, P2 = P[Y, X1], P[Y, X2]
+    n = len(regions)
+    d = np.bincount(R, weights=P2 - P1, minlength=n).astype(float, copy=False)
+    x = np.bincount(R, weights=(X2 * P2 - Q[Y, X2]) - (X1 * P1 - Q[Y, X1]), minlength=n).astype(float, copy=False)
+    y = np.bincount(R, weights=Y * (P2 - P1), minlength=n).astype(float, copy=False)
+    # Smaller masses are rounding noise (e.g. reduced precision prefix sums)
+    nonzero = d > 1e-4
+    x[nonzero] /= d[nonzero]
+    y[nonzero] /= d[nonzero]
+    if return_weights:
+        return np.stack([x, y], axis=1), np.where(nonzero, d, 0)
+    return np.stack([x, y], axis=1)
+
+
 def uniform_centroid(V):
     """
     Given an ordered set of vertices V describing a polygon,
@@ -169,7 +273,18 @@ def in_box(points, bbox):
         np.logical_and(bbox[2] <= points[:, 1], points[:, 1] <= bbox[3]))
 
 
-def voronoi(points, bbox):
+def mirror_margins(points, neighbors=6, factor=2):
+    """
+    Return, for every point, how close it has to be to an edge of the
+    bounding box to need a mirror: factor times the distance to its
+    neighbors-th nearest neighbor (local point spacing).
+    """
+    k = min(neighbors + 1, len(points))
+    distances, _ = scipy.spatial.KDTree(points).query(points, k=k)
+    return factor * np.atleast_2d(distances.T).T[:, -1]
+
+
+def voronoi(points, bbox, border_only=False):
     # See http://stackoverflow.com/questions/28665491/...
     #   ...getting-a-bounded-polygon-coordinates-from-voronoi-cells
     # See also https://gist.github.com/pv/8036995
@@ -177,15 +292,23 @@ def voronoi(points, bbox):
     # Select points inside the bounding box
     i = in_box(points, bbox)
 
-    # Mirror points
+    # Mirror points (only the ones close to each edge in border only mode)
     points_center = points[i, :]
-    points_left = np.copy(points_center)
+    if border_only:
+        margin = mirror_margins(points_center)
+        near_left = points_center[:, 0] - bbox[0] < margin
+        near_right = bbox[1] - points_center[:, 0] < margin
+        near_down = points_center[:, 1] - bbox[2] < margin
+        near_up = bbox[3] - points_center[:, 1] < margin
+    else:
+        near_left = near_right = near_down = near_up = slice(None)
+    points_left = np.copy(points_center[near_left])
     points_left[:, 0] = bbox[0] - (points_left[:, 0] - bbox[0])
-    points_right = np.copy(points_center)
+    points_right = np.copy(points_center[near_right])
     points_right[:, 0] = bbox[1] + (bbox[1] - points_right[:, 0])
-    points_down = np.copy(points_center)
+    points_down = np.copy(points_center[near_down])
     points_down[:, 1] = bbox[2] - (points_down[:, 1] - bbox[2])
-    points_up = np.copy(points_center)
+    points_up = np.copy(points_center[near_up])
     points_up[:, 1] = bbox[3] + (bbox[3] - points_up[:, 1])
     points = np.append(points_center,
                        np.append(np.append(points_left, points_right, axis=0),
@@ -194,26 +317,31 @@ def voronoi(points, bbox):
     # Compute Voronoi
     vor = scipy.spatial.Voronoi(points)
 
-    # Filter regions
+    # Filter regions, keeping them in the order of the (center) points
     epsilon = 0.1
-    regions = []
-    for region in vor.regions:
-        flag = True
-        for index in region:
-            if index == -1:
-                flag = False
-                break
-            else:
-                x = vor.vertices[index, 0]
-                y = vor.vertices[index, 1]
-                if not (bbox[0] - epsilon <= x <= bbox[1] + epsilon and
-                        bbox[2] - epsilon <= y <= bbox[3] + epsilon):
-                    flag = False
-                    break
-        if region != [] and flag:
-            regions.append(region)
+    vertex_ok = (
+        (bbox[0] - epsilon <= vor.vertices[:, 0]) & (vor.vertices[:, 0] <= bbox[1] + epsilon) &
+        (bbox[2] - epsilon <= vor.vertices[:, 1]) & (vor.vertices[:, 1] <= bbox[3] + epsilon)
+    )
+    center_regions = [vor.regions[_] for _ in vor.point_region[:len(points_center)]]
+    lengths = np.array([len(_) for _ in center_regions], dtype=int)
+    flat = np.fromiter((_ for region in center_regions for _ in region), dtype=int, count=lengths.sum())
+    owner = np.repeat(np.arange(len(center_regions)), lengths)
+    flat_ok = (flat >= 0) & vertex_ok[flat]
+    # Count the bad vertices of every region (empty regions are rejected too)
+    bad = np.bincount(owner[~flat_ok], minlength=len(center_regions))
+    indices = np.flatnonzero((lengths > 0) & (bad == 0))
+
+    if border_only and len(indices) < len(points_center):
+        # Some edge cell was not bounded by the mirrors, fall back to mirroring everything
+        vor = voronoi(points_center, bbox, border_only=False)
+        vor.filtered_indices = np.flatnonzero(i)[vor.filtered_indices]
+        return vor
+
     vor.filtered_points = points_center
-    vor.filtered_regions = regions
+    vor.filtered_regions = [center_regions[_] for _ in indices]
+    # Index into the input points of each filtered region
+    vor.filtered_indices = np.flatnonzero(i)[indices]
     return vor
 
 
@@ -233,29 +361,159 @@ def centroids(points, density, density_P=None, density_Q=None):
     bbox = np.array([xmin, xmax, ymin, ymax])
     vor = voronoi(points, bbox)
     regions = vor.filtered_regions
-    centroids = []
-    for region in regions:
-        vertices = vor.vertices[region + [region[0]], :]
-        # vertices = vor.filtered_points[region + [region[0]], :]
-
-        # Full version from all the points
-        # centroid = weighted_centroid(vertices, density)
 
-        # Optimized version from only the outline
-        centroid = weighted_centroid_outline(vertices, density_P, density_Q)
-
-        centroids.append(centroid)
-    return regions, np.array(centroids)
+    # All the outlines at once (see weighted_centroid_outline for a single region)
+    centroids = weighted_centroids_outline(vor.vertices, regions, density_P, density_Q)
+    return regions, centroids
 
 # ---- END OF ORIGINAL FILE ---- #
+import os
 import sys
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from enum import Enum
+from multiprocessing.shared_memory import SharedMemory
+
 import scipy.ndimage
 
 from etatime import EtaBar
 
+from tspart._helpers import white_mask
+
+
+class CentroidMethod(Enum):
+    OUTLINE = "outline"
+    PIXEL = "pixel"
+
+
+class InitializationMethod(Enum):
+    REJECTION = "rejection"
+    INVERSE_CDF = "inverse_cdf"
+    DITHER = "dither"
+
+
+class ConvergenceCriterion(Enum):
+    MEAN = "mean"
+    MAX = "max"
+
+
+def pixel_moments(points, density, chunk_size=2 ** 20):
+    """
+    Assign every pixel with a non-zero density to its nearest point
+    (KD-tree), and return the density mass and the x & y first moments
+    owned by each point, reduced with np.bincount over those labels.
+    """
+
+    n = len(points)
+    tree = scipy.spatial.KDTree(points)
+    Y, X = np.nonzero(density)
+    W = density[Y, X]
+
+    d = np.zeros(n)
+    x = np.zeros(n)
+    y = np.zeros(n)
+    for start in range(0, len(W), chunk_size):
+        end = start + chunk_size
+        Xc, Yc, Wc = X[start:end], Y[start:end], W[start:end]
+        _, labels = tree.query(np.stack([Xc, Yc], axis=1), workers=-1)
+        d += np.bincount(labels, weights=Wc, minlength=n)
+        x += np.bincount(labels, weights=Wc * Xc, minlength=n)
+        y += np.bincount(labels, weights=Wc * Yc, minlength=n)
+
+    return d, x, y
+
+
+def pixel_centroids(points, density, chunk_size=2 ** 20):
+    """
+    Given a set of point and a density array, return the set of weighted
+    centroids, in the same order as the points.
+
+    Instead of building a Voronoi diagram, the pixels are assigned to
+    their nearest point (see pixel_moments). Points that own no weight
+    keep their position.
+    """
+
+    d, x, y = pixel_moments(points, density, chunk_size)
+
+    result = np.array(points, dtype=float)
+    nonzero = d > 0
+    result[nonzero, 0] = x[nonzero] / d[nonzero]
+    result[nonzero, 1] = y[nonzero] / d[nonzero]
+    return result
+
+
+def lloyd_step(
+        points,
+        density,
+        density_P=None,
+        density_Q=None,
+        method=CentroidMethod.OUTLINE,
+        active=None,
+        border_only=False
+):
+    """
+    Run one Lloyd iteration, moving the points to their weighted
+    centroids.
+
+    Return the new points and the displacement of each of them (in
+    density pixels). With the outline method, points whose region was
+    filtered out of the Voronoi diagram are dropped.
+
+    When active is given (boolean mask over points, outline method only),
+    only the regions of active points and of their Voronoi neighbors
+    (through vor.ridge_points) are re-rasterized; every other point is
+    frozen in place.
+
+    With border_only, the Voronoi diagram only mirrors points near the
+    edges (see voronoi).
+    """
+
+    method = CentroidMethod(method)
+    if active is not None and method != CentroidMethod.OUTLINE:
+        raise ValueError("Active sets are only supported by the outline method")
+
+    match method:
+        case CentroidMethod.OUTLINE:
+            bbox = np.array([0, density.shape[1], 0, density.shape[0]])
+            vor = voronoi(points, bbox, border_only=border_only)
+            regions = vor.filtered_regions
+            previous = points[vor.filtered_indices]
+            if active is None:
+                result, weights = weighted_centroids_outline(
+                    vor.vertices, regions, density_P, density_Q, return_weights=True
+                )
+                # Regions without any density keep their point
+                result[weights == 0] = previous[weights == 0]
+            else:
+                # Active points and their neighbors, over the (center) points given to qhull
+                center = np.flatnonzero(in_box(points, bbox))
+                active_center = np.asarray(active)[center]
+                update_center = active_center.copy()
+                ridges = vor.ridge_points[(vor.ridge_points < len(center)).all(axis=1)]
+                update_center[ridges[:, 1][active_center[ridges[:, 0]]]] = True
+                update_center[ridges[:, 0][active_center[ridges[:, 1]]]] = True
+                update = np.zeros(len(points), dtype=bool)
+                update[center[update_center]] = True
+
+                recompute = np.flatnonzero(update[vor.filtered_indices])
+                result = previous.copy()
+                moved, weights = weighted_centroids_outline(
+                    vor.vertices, [regions[_] for _ in recompute], density_P, density_Q, return_weights=True
+                )
+                result[recompute[weights > 0]] = moved[weights > 0]
+        case CentroidMethod.PIXEL:
+            result = pixel_centroids(points, density)
+            previous = points
+
+    displacement = np.hypot(*(result - previous).T)
+    return result, displacement
 
-def normalize(D):
-    Vmin, Vmax = D.min(), D.max()
+
+def normalize(D, Vmin=None, Vmax=None):
+    if Vmin is None:
+        Vmin = D.min()
+    if Vmax is None:
+        Vmax = D.max()
     if Vmax - Vmin > 1e-5:
         D = (D - Vmin) / (Vmax - Vmin)
     else:
@@ -271,62 +529,960 @@ def initialization(n, D):
     with xmin, xmax = 0, density.shape[1]
          ymin, ymax = 0, density.shape[0]
 
-    The algorithm here is a simple rejection sampling.
+    The algorithm here is a simple rejection sampling, accepting
+    whole batches of candidates at once.
     """
 
     samples = []
-    while len(samples) < n:
+    count = 0
+    while count < n:
         # X = np.random.randint(0, D.shape[1], 10*n)
         # Y = np.random.randint(0, D.shape[0], 10*n)
         X = np.random.uniform(0, D.shape[1], 10 * n)
         Y = np.random.uniform(0, D.shape[0], 10 * n)
         P = np.random.uniform(0, 1, 10 * n)
-        index = 0
-        while index < len(X) and len(samples) < n:
-            x, y = X[index], Y[index]
-            x_, y_ = int(np.floor(x)), int(np.floor(y))
-            if P[index] < D[y_, x_]:
-                samples.append([x, y])
-            index += 1
-    return np.array(samples)
+        accepted = P < D[Y.astype(int), X.astype(int)]
+        batch = np.stack([X[accepted], Y[accepted]], axis=1)[:n - count]
+        samples.append(batch)
+        count += len(batch)
+    return np.concatenate(samples)
+
+
+def initialization_cdf(n, D, D_P=None):
+    """
+    Return n points distributed over [xmin, xmax] x [ymin, ymax]
+    according to density distribution.
 
+    with xmin, xmax = 0, density.shape[1]
+         ymin, ymax = 0, density.shape[0]
+
+    The algorithm here is an inverse CDF sampling over the cumulative
+    density, so no sample is ever rejected. A row is picked from the
+    cumulative row totals, then a column with a vectorized binary search
+    over D_P = D.cumsum(axis=1) (computed when not given).
+    """
+
+    if D_P is None:
+        D_P = D.cumsum(axis=1)
+    rows = D_P[:, -1].cumsum()
+    if rows[-1] <= 0:
+        raise ValueError("Density is zero everywhere")
+
+    U = np.random.uniform(0, rows[-1], n)
+    Y = np.minimum(np.searchsorted(rows, U, side="right"), len(rows) - 1)
+    R = U - (rows[Y] - D_P[Y, -1])
+
+    # First column whose cumulative density exceeds the remainder
+    low = np.zeros(n, dtype=int)
+    high = np.full(n, D.shape[1] - 1)
+    while np.any(low < high):
+        middle = (low + high) // 2
+        right = D_P[Y, middle] > R
+        high = np.where(right, middle, high)
+        low = np.where(right, low, middle + 1)
+    X = low
+
+    return np.stack([
+        X + np.random.uniform(0, 1, n),
+        Y + np.random.uniform(0, 1, n)
+    ], axis=1)
+
+
+def initialization_dither(n, D, D_P=None, cell_points=0.5):
+    """
+    Return about n points distributed over [xmin, xmax] x [ymin, ymax]
+    according to density distribution, already close to a blue noise
+    (Lloyd equilibrium) layout.
+
+    with xmin, xmax = 0, density.shape[1]
+         ymin, ymax = 0, density.shape[0]
+
+    The density is summed over square cells holding cell_points points on
+    average, and the expected point counts of the cells are error diffused
+    (serpentine Floyd-Steinberg) into integer counts. The points of a cell
+    are placed around its weighted centroid. The count is then fixed up to
+    exactly n with resize_points.
+    """
 
-def stipple_image(grayscale_array, points=5000, iterations=50, logging=True):
+    height, width = D.shape
+    total = float(D.sum())
+    if total <= 0:
+        raise ValueError("Density is zero everywhere")
+
+    cell = max(1, int(np.sqrt(cell_points * D.size / n)))
+    rows = np.arange(0, height, cell)
+    columns = np.arange(0, width, cell)
+
+    def cell_sums(array):
+        return np.add.reduceat(np.add.reduceat(array, rows, axis=0), columns, axis=1)
+
+    mass = cell_sums(D.astype(float, copy=False))
+    moment_x = cell_sums(D * np.arange(width)[np.newaxis, :])
+    moment_y = cell_sums(D * np.arange(height)[:, np.newaxis])
+
+    # Serpentine Floyd-Steinberg error diffusion of the expected counts
+    target = mass * (n / total)
+    counts = np.zeros(target.shape, dtype=int)
+    cells_y, cells_x = target.shape
+    for y in range(cells_y):
+        step = 1 if y % 2 == 0 else -1
+        for x in (range(cells_x) if step == 1 else range(cells_x - 1, -1, -1)):
+            value = target[y, x]
+            count = max(0, int(np.floor(value + 0.5)))
+            counts[y, x] = count
+            error = value - count
+            if 0 <= x + step < cells_x:
+                target[y, x + step] += error * 7 / 16
+            if y + 1 < cells_y:
+                if 0 <= x - step < cells_x:
+                    target[y + 1, x - step] += error * 3 / 16
+                target[y + 1, x] += error * 5 / 16
+                if 0 <= x + step < cells_x:
+                    target[y + 1, x + step] += error * 1 / 16
+
+    Y, X = np.nonzero(counts)
+    repeats = counts[Y, X]
+    centroids = np.stack([
+        moment_x[Y, X] / mass[Y, X] + 0.5,
+        moment_y[Y, X] / mass[Y, X] + 0.5
+    ], axis=1).repeat(repeats, axis=0)
+    # Spread the points of crowded cells, jitter the others a bit
+    spread = np.repeat(np.where(repeats > 1, cell / 2, cell / 8), repeats)
+    points = centroids + np.random.uniform(-1, 1, centroids.shape) * spread[:, np.newaxis]
+
+    return resize_points(points, n, D, D_P)
+
+
+def image_zoom(shape, points, method=CentroidMethod.OUTLINE):
     # We want (approximately) 500 pixels per voronoi region
-    zoom = (points * 500) / (grayscale_array.shape[0] * grayscale_array.shape[1])
-    density = scipy.ndimage.zoom(grayscale_array, zoom, order=0)
+    zoom = (points * 500) / (shape[0] * shape[1])
+    if CentroidMethod(method) == CentroidMethod.PIXEL:
+        # The zoom is applied per axis, and the pixel assignment cost scales with the pixel count
+        zoom = np.sqrt(zoom)
+    return zoom
+
+
+def _memmap_empty(shape, dtype, directory):
+    # Disk backed array, its temporary file goes away with it
+    return np.memmap(tempfile.TemporaryFile(dir=directory), dtype=dtype, mode="w+", shape=shape)
 
-    density = 1.0 - normalize(density)
-    density_P = density.cumsum(axis=1)
-    density_Q = density_P.cumsum(axis=1)
 
-    # Initialization
-    stippled = initialization(points, density)
+class _PrefixSumsView:
+    # Array-like (shape & fancy indexing) view of the P or Q sums of a BlockedPrefixSums
+    def __init__(self, sums, kind):
+        self.sums = sums
+        self.kind = kind
+        self.shape = sums.shape
+
+    def __getitem__(self, index):
+        Y, X = index
+        Y = np.arange(self.shape[0])[Y]
+        X = np.arange(self.shape[1])[X]
+        return self.sums.values(Y, X, self.kind)
+
+
+class BlockedPrefixSums:
+    """
+    Reduced precision row prefix sums of a density D.
 
+    Stands in for density_P = D.cumsum(axis=1) and density_Q =
+    density_P.cumsum(axis=1) (the P and Q attributes, which can be
+    indexed like them). Rows are cut into blocks of block columns, and
+    the sums are stored as dtype values local to their block plus float64
+    offsets for every block. The magnitudes of Q (up to width ** 2 / 2)
+    would otherwise eat the whole float32 mantissa. The sums are
+    accumulated in float64 over chunks of rows before being rounded.
+    """
+
+    def __init__(self, density, dtype=np.float32, block=256, rows=256, memmap_dir=None):
+        height, width = density.shape
+        blocks = -(-width // block)
+        self.shape = density.shape
+        self.block = block
+
+        if memmap_dir is None:
+            self.local_P = np.empty(density.shape, dtype=dtype)
+            self.local_Q = np.empty(density.shape, dtype=dtype)
+        else:
+            self.local_P = _memmap_empty(density.shape, dtype, memmap_dir)
+            self.local_Q = _memmap_empty(density.shape, dtype, memmap_dir)
+        self.offset_P = np.empty((height, blocks))
+        self.offset_Q = np.empty((height, blocks))
+
+        for start in range(0, height, rows):
+            end = min(start + rows, height)
+            D = np.zeros((end - start, blocks * block))
+            D[:, :width] = density[start:end]
+            D = D.reshape(end - start, blocks, block)
+
+            P = D.cumsum(axis=2)
+            Q = P.cumsum(axis=2)
+            self.local_P[start:end] = P.reshape(end - start, -1)[:, :width]
+            self.local_Q[start:end] = Q.reshape(end - start, -1)[:, :width]
+
+            # Sums before every block: Q grows by its local sums plus block * the P offset
+            self.offset_P[start:end] = P[:, :, -1].cumsum(axis=1) - P[:, :, -1]
+            increments = block * self.offset_P[start:end] + Q[:, :, -1]
+            self.offset_Q[start:end] = increments.cumsum(axis=1) - increments
+
+        self.P = _PrefixSumsView(self, "P")
+        self.Q = _PrefixSumsView(self, "Q")
+
+    def values(self, Y, X, kind="P"):
+        B = X // self.block
+        P = self.offset_P[Y, B]
+        if kind == "P":
+            return P + self.local_P[Y, X]
+        return self.offset_Q[Y, B] + (X - B * self.block + 1) * P + self.local_Q[Y, X]
+
+
+def image_density(
+        grayscale_array,
+        zoom,
+        method=CentroidMethod.OUTLINE,
+        value_range=None,
+        memmap_dir=None,
+        dtype=np.float64,
+        white_threshold=None,
+        white_blur_sigma=1
+):
+    """
+    Return the density (dark is dense) of a grayscale array zoomed by
+    zoom, and its density_P & density_Q prefix sums (None with the pixel
+    method, which does not use them).
+
+    value_range optionally gives the (min, max) gray values to normalize
+    with, instead of the ones of the array (e.g. for a tile of a larger
+    image). With memmap_dir, the arrays are np.memmap backed by temporary
+    files in that directory.
+
+    With a dtype other than float64 (e.g. float32), the density is
+    stored with it and the prefix sums are BlockedPrefixSums views.
+
+    With white_threshold, the density is zeroed where the (blurred) gray
+    is above it (see white_mask), so no point can settle there.
+    """
+
+    density = scipy.ndimage.zoom(grayscale_array, zoom, order=0).astype(dtype, copy=False)
+
+    if value_range is None:
+        density = 1.0 - normalize(density)
+    else:
+        density = 1.0 - normalize(density, *np.array(value_range, dtype=dtype))
+    if white_threshold is not None:
+        mask = white_mask(grayscale_array, white_threshold, white_blur_sigma)
+        density[scipy.ndimage.zoom(mask, zoom, order=0)] = 0
+    if memmap_dir is not None:
+        density_memmap = _memmap_empty(density.shape, density.dtype, memmap_dir)
+        density_memmap[:] = density
+        density = density_memmap
+
+    density_P = density_Q = None
+    if CentroidMethod(method) == CentroidMethod.OUTLINE:
+        if np.dtype(dtype) != np.float64:
+            sums = BlockedPrefixSums(density, dtype=dtype, memmap_dir=memmap_dir)
+            density_P, density_Q = sums.P, sums.Q
+        elif memmap_dir is None:
+            density_P = density.cumsum(axis=1)
+            density_Q = density_P.cumsum(axis=1)
+        else:
+            density_P = density.cumsum(axis=1, out=_memmap_empty(density.shape, density.dtype, memmap_dir))
+            density_Q = density_P.cumsum(axis=1, out=_memmap_empty(density.shape, density.dtype, memmap_dir))
+
+    return density, density_P, density_Q
+
+
+def plan_memory(shape, points, method=CentroidMethod.OUTLINE, memory_budget=None, jobs=1):
+    """
+    Return the density dtype and tile size (None when not tiling) to
+    stipple an image of the given shape within memory_budget bytes,
+    shared by jobs concurrent stipplings (or tiles). float64 is kept when
+    it fits (or without memory_budget), then float32, then float32 with
+    tiles small enough to fit.
+
+    The estimate is a rough peak of bytes per zoomed pixel: the zoomed
+    array, the density, its normalization temporaries and the prefix
+    sums (outline method) or pixel coordinates (pixel method).
+    """
+
+    if memory_budget is None:
+        return np.float64, None
+
+    method = CentroidMethod(method)
+    zoom = image_zoom(shape, points, method)
+    pixels = max(1, round(shape[0] * zoom) * round(shape[1] * zoom))
+    budget = memory_budget / max(1, jobs or 1)
+
+    def bytes_per_pixel(dtype):
+        size = np.dtype(dtype).itemsize
+        if method == CentroidMethod.OUTLINE:
+            return 8 + 5 * size
+        return 8 + 3 * size + 16
+
+    for dtype in (np.float64, np.float32):
+        if pixels * bytes_per_pixel(dtype) <= budget:
+            return dtype, None
+
+    # Tiles are extended by a halo of an eighth of their size on every side
+    tile_pixels = budget / bytes_per_pixel(np.float32)
+    tile_size = int(np.sqrt(tile_pixels) / zoom / 1.25)
+    return np.float32, max(16, tile_size)
+
+
+def initialize_points(n, density, density_P=None, init_method=InitializationMethod.REJECTION):
+    match InitializationMethod(init_method):
+        case InitializationMethod.REJECTION:
+            return initialization(n, density)
+        case InitializationMethod.INVERSE_CDF:
+            return initialization_cdf(n, density, density_P)
+        case InitializationMethod.DITHER:
+            return initialization_dither(n, density, density_P)
+
+
+def split_points(points, n, shape):
+    """
+    Split every point into 4 children around it (a quarter of the
+    distance to its nearest neighbor away), then keep n of them at random.
+    The children are kept inside [0, shape[1]] x [0, shape[0]].
+    """
+
+    if len(points) > 1:
+        distances, _ = scipy.spatial.KDTree(points).query(points, k=2)
+        offset = distances[:, 1:] / 4
+    else:
+        offset = np.full((len(points), 1), 0.25)
+    children = np.concatenate([
+        points + offset * np.array(direction) for direction in ((-1, -1), (-1, 1), (1, -1), (1, 1))
+    ])
+    if len(children) > n:
+        children = children[np.random.choice(len(children), n, replace=False)]
+
+    epsilon = 1e-3
+    children[:, 0] = np.clip(children[:, 0], epsilon, shape[1] - epsilon)
+    children[:, 1] = np.clip(children[:, 1], epsilon, shape[0] - epsilon)
+    return children
+
+
+def resize_points(points, n, density, density_P=None):
+    """
+    Return n points, starting from an existing set of points.
+
+    Points where the density is zero (e.g. masked white areas) are
+    dropped first. Missing points are inserted by density weighted
+    (inverse CDF) sampling. Extra points are removed lowest weight first,
+    the weight
+    of a point being the density mass nearest to it (measured on a grid
+    subsampled to about 500 pixels per point).
+    """
+
+    points = np.asarray(points, dtype=float)
+    epsilon = 1e-3
+    points = np.stack([
+        np.clip(points[:, 0], epsilon, density.shape[1] - epsilon),
+        np.clip(points[:, 1], epsilon, density.shape[0] - epsilon)
+    ], axis=1)
+    points = points[density[points[:, 1].astype(int), points[:, 0].astype(int)] > 0]
+
+    if len(points) < n:
+        inserted = initialization_cdf(n - len(points), density, density_P)
+        points = np.concatenate([points, inserted])
+    elif len(points) > n:
+        step = max(1, int(np.sqrt(density.size / (len(points) * 500))))
+        weights, _, _ = pixel_moments(points / step, density[::step, ::step])
+        points = points[np.sort(np.argsort(weights, kind="stable")[len(points) - n:])]
+
+    return points
+
+
+def _relax(
+        stippled,
+        density,
+        density_P,
+        density_Q,
+        zoom,
+        iterations,
+        method,
+        tolerance,
+        criterion,
+        freeze_tolerance,
+        border_only,
+        logging,
+        level=0
+):
+    # Generator of the snapshots of every iteration, returning the final points (density pixels)
     if logging:
         iter = EtaBar(range(iterations))
     else:
         iter = range(iterations)
 
-    for _ in iter:
-        regions, stippled = centroids(stippled, density, density_P, density_Q)
+    active = None
+    measured = None
+    for iteration in iter:
+        stippled, displacement = lloyd_step(
+            stippled, density, density_P, density_Q, method, active, border_only
+        )
+
+        displacement = displacement / zoom
+        # Frozen points keep their last measured displacement, for the stats and the convergence check
+        if active is not None and len(active) == len(displacement):
+            displacement = np.where(active | (displacement > 0), displacement, measured)
+        measured = displacement
+        if freeze_tolerance is not None:
+            active = displacement >= freeze_tolerance
+        snapshot = {
+            "level": level,
+            "iteration": iteration,
+            "mean": float(displacement.mean()) if len(displacement) else 0.0,
+            "max": float(displacement.max()) if len(displacement) else 0.0,
+            "points": stippled / zoom
+        }
+        yield snapshot
+
+        if tolerance is not None and snapshot[criterion.value] < tolerance:
+            if logging:
+                print(f"Converged after {iteration + 1} iterations", file=sys.stderr)
+            break
+        if active is not None and not active.any():
+            if logging:
+                print(f"All points frozen after {iteration + 1} iterations", file=sys.stderr)
+            break
+
+    return stippled
+
+
+def _consume(snapshots, stats):
+    # Run a snapshot generator to the end, collecting the stats, and return its result
+    while True:
+        try:
+            snapshot = next(snapshots)
+        except StopIteration as stop:
+            return stop.value
+        stats.append({_: snapshot[_] for _ in snapshot if _ != "points"})
+
+
+def stipple_image_iter(
+        grayscale_array,
+        points=5000,
+        iterations=50,
+        method=CentroidMethod.OUTLINE,
+        init_method=InitializationMethod.REJECTION,
+        tolerance=None,
+        criterion=ConvergenceCriterion.MEAN,
+        freeze_tolerance=None,
+        border_only=False,
+        pyramid_levels=1,
+        refine_iterations=10,
+        initial_points=None,
+        dtype=np.float64,
+        white_threshold=None,
+        white_blur_sigma=1,
+        logging=True
+):
+    """
+    Generator variant of stipple_image, taking the same arguments.
+
+    After every Lloyd iteration, yield a snapshot dict with the "level"
+    and "iteration" indexes, the "mean" and "max" point displacement and
+    the current "points", all in source image pixels. The points array
+    is not reused by later iterations, so it can be kept as a checkpoint.
+    The caller can stop early by simply not asking for more. The final
+    points are the generator return value.
+    """
+
+    method = CentroidMethod(method)
+    init_method = InitializationMethod(init_method)
+    criterion = ConvergenceCriterion(criterion)
+    if freeze_tolerance is not None and method != CentroidMethod.OUTLINE:
+        raise ValueError("freeze_tolerance is only supported by the outline method")
+    pyramid_levels = max(1, pyramid_levels)
+    if initial_points is not None:
+        pyramid_levels = 1
+
+    zoom = image_zoom(grayscale_array.shape, points, method)
+
+    stippled = None
+    level_zoom = None
+    for level in range(pyramid_levels):
+        scale = 2 ** (pyramid_levels - 1 - level)
+        level_points = int(np.ceil(points / scale ** 2))
+        previous_zoom, level_zoom = level_zoom, zoom / scale
+        if logging and pyramid_levels > 1:
+            print(f"Pyramid level {level + 1}/{pyramid_levels} ({level_points} points)", file=sys.stderr)
+
+        density, density_P, density_Q = image_density(
+            grayscale_array, level_zoom, method, dtype=dtype,
+            white_threshold=white_threshold, white_blur_sigma=white_blur_sigma
+        )
+        if not density.any():
+            raise ValueError("Density is zero everywhere")
+
+        # Initialization
+        if initial_points is not None:
+            stippled = resize_points(np.asarray(initial_points) * level_zoom, level_points, density, density_P)
+        elif stippled is None:
+            stippled = initialize_points(level_points, density, density_P, init_method)
+        else:
+            stippled = split_points(stippled * (level_zoom / previous_zoom), level_points, density.shape)
+
+        if pyramid_levels > 1 and level == pyramid_levels - 1:
+            level_iterations = refine_iterations
+        else:
+            level_iterations = iterations
+
+        stippled = yield from _relax(
+            stippled=stippled,
+            density=density,
+            density_P=density_P,
+            density_Q=density_Q,
+            zoom=level_zoom,
+            iterations=level_iterations,
+            method=method,
+            tolerance=tolerance,
+            criterion=criterion,
+            freeze_tolerance=freeze_tolerance,
+            border_only=border_only,
+            logging=logging,
+            level=level
+        )
 
     return stippled / zoom
 
 
-def stipple_image_multi(grayscale_arrays, points=5000, iterations=50, logging=True):
+def stipple_image(
+        grayscale_array,
+        points=5000,
+        iterations=50,
+        method=CentroidMethod.OUTLINE,
+        init_method=InitializationMethod.REJECTION,
+        tolerance=None,
+        criterion=ConvergenceCriterion.MEAN,
+        freeze_tolerance=None,
+        border_only=False,
+        pyramid_levels=1,
+        refine_iterations=10,
+        initial_points=None,
+        dtype=np.float64,
+        white_threshold=None,
+        white_blur_sigma=1,
+        return_stats=False,
+        logging=True
+):
+    """
+    Stipple a grayscale image with weighted Voronoi (Lloyd) relaxation.
+
+    When tolerance is set, stop as soon as the mean or max (per criterion)
+    point displacement of an iteration, in source image pixels, falls
+    below it, iterations being the cap. With return_stats, also return
+    a list with the displacement stats of every iteration run.
+
+    When freeze_tolerance is set (outline method only), points that moved
+    less than it (in source image pixels) are frozen, and only the cells
+    next to still moving points are recomputed on the next iteration.
+    Frozen points count with their last measured displacement in the
+    stats and the tolerance check, and stippling stops once all the
+    points are frozen.
+
+    With border_only (outline method), only the points close to the image
+    edges are mirrored to bound the Voronoi diagram.
+
+    With pyramid_levels above 1, stippling runs coarse to fine: each level
+    below the full resolution halves the zoom and quarters the number of
+    points, and runs iterations relaxations. The points are then split
+    into the next level, and the full resolution level only runs
+    refine_iterations relaxations.
+
+    With initial_points (in source image pixels, e.g. a previous result),
+    stippling warm starts from them instead of a random initialization,
+    inserting or removing points to reach points (see resize_points).
+    The pyramid is skipped in that case.
+
+    dtype is the precision of the density pipeline, float32 halves its
+    memory (see image_density).
+
+    With white_threshold, the white areas of the image (see white_mask)
+    are masked out of the density, so all the points land outside of
+    them instead of being filtered out afterwards.
+
+    See stipple_image_iter to follow the iterations as they run.
+    """
+
+    stats = []
+    stippled = _consume(stipple_image_iter(
+        grayscale_array=grayscale_array,
+        points=points,
+        iterations=iterations,
+        method=method,
+        init_method=init_method,
+        tolerance=tolerance,
+        criterion=criterion,
+        freeze_tolerance=freeze_tolerance,
+        border_only=border_only,
+        pyramid_levels=pyramid_levels,
+        refine_iterations=refine_iterations,
+        initial_points=initial_points,
+        dtype=dtype,
+        white_threshold=white_threshold,
+        white_blur_sigma=white_blur_sigma,
+        logging=logging
+    ), stats)
+
+    if return_stats:
+        return stippled, stats
+
+    return stippled
+
+
+def merge_seam_points(points, tiles, factor=0.5, neighbors=6):
+    """
+    Merge every pair of points coming from different tiles (tiles gives
+    the tile index of every point) that are closer than factor times
+    their local spacing (mean distance to their neighbors nearest
+    neighbors) into their midpoint.
+    """
+
+    points = np.asarray(points, dtype=float)
+    tiles = np.asarray(tiles)
+    k = min(neighbors + 1, len(points))
+    if k < 2:
+        return points
+
+    distances, indices = scipy.spatial.KDTree(points).query(points, k=k)
+    spacing = distances[:, 1:].mean(axis=1)
+    nearest = indices[:, 1]
+    close = (distances[:, 1] < factor * np.minimum(spacing, spacing[nearest])) & (tiles != tiles[nearest])
+    pairs = np.unique(np.sort(np.stack([np.flatnonzero(close), nearest[close]], axis=1), axis=1), axis=0)
+
+    keep = np.ones(len(points), dtype=bool)
+    merged = []
+    for a, b in pairs:
+        if keep[a] and keep[b]:
+            keep[a] = keep[b] = False
+            merged.append((points[a] + points[b]) / 2)
+
+    return np.concatenate([points[keep], np.reshape(merged, (-1, 2))])
+
+
+def _density_mass(grayscale_array, value_range, white_threshold=None, white_blur_sigma=1):
+    density = 1.0 - normalize(grayscale_array.astype(float), *value_range)
+    if white_threshold is not None:
+        density[white_mask(grayscale_array, white_threshold, white_blur_sigma)] = 0
+    return float(density.sum())
+
+
+def _stipple_tile(grayscale_array, zoom, points, value_range, memmap_dir, seed, options):
+    # Stipple one (halo extended) tile, in tile source pixels
+    np.random.seed(seed)
+    density, density_P, density_Q = image_density(
+        grayscale_array, zoom, options["method"], value_range, memmap_dir, options["dtype"],
+        options["white_threshold"], options["white_blur_sigma"]
+    )
+    stippled = initialize_points(points, density, density_P, options["init_method"])
+
+    stats = []
+    stippled = _consume(_relax(
+        stippled=stippled,
+        density=density,
+        density_P=density_P,
+        density_Q=density_Q,
+        zoom=zoom,
+        logging=False,
+        **{_: options[_] for _ in (
+            "iterations", "method", "tolerance", "criterion", "freeze_tolerance", "border_only"
+        )}
+    ), stats)
+
+    return stippled / zoom, stats
+
+
+def stipple_image_tiled(
+        grayscale_array,
+        points=5000,
+        iterations=50,
+        method=CentroidMethod.OUTLINE,
+        init_method=InitializationMethod.REJECTION,
+        tolerance=None,
+        criterion=ConvergenceCriterion.MEAN,
+        freeze_tolerance=None,
+        border_only=False,
+        tile_size=1024,
+        halo=None,
+        memmap_dir=None,
+        dtype=np.float64,
+        white_threshold=None,
+        white_blur_sigma=1,
+        workers=1,
+        return_stats=False,
+        logging=True
+):
+    """
+    Stipple a (large) grayscale image tile by tile, so that the peak
+    memory scales with the tile size instead of the image size.
+
+    The image is cut into tile_size x tile_size tiles (source pixels).
+    Every tile is stippled on its own, extended by a halo of halo pixels
+    (tile_size // 8 by default) and with as many points as the density
+    it holds, and only the points landing in the tile itself are kept.
+    Points crowding each other across tile seams are then merged (see
+    merge_seam_points). With memmap_dir, the tile densities are disk
+    backed (see image_density). With workers other than 1, the tiles are
+    stippled concurrently in a process pool.
+
+    The other arguments are the ones of stipple_image, the stats of every
+    tile are tagged with its index.
+    """
+
+    method = CentroidMethod(method)
+    options = dict(
+        iterations=iterations,
+        method=method,
+        init_method=InitializationMethod(init_method),
+        tolerance=tolerance,
+        criterion=ConvergenceCriterion(criterion),
+        freeze_tolerance=freeze_tolerance,
+        border_only=border_only,
+        dtype=dtype,
+        white_threshold=white_threshold,
+        white_blur_sigma=white_blur_sigma
+    )
+    if halo is None:
+        halo = tile_size // 8
+
+    height, width = grayscale_array.shape[:2]
+    zoom = image_zoom(grayscale_array.shape, points, method)
+    value_range = (grayscale_array.min(), grayscale_array.max())
+
+    # Tiles as (core, halo extended) boxes of (y0, y1, x0, x1)
+    tiles = []
+    for y0 in range(0, height, tile_size):
+        for x0 in range(0, width, tile_size):
+            y1, x1 = min(y0 + tile_size, height), min(x0 + tile_size, width)
+            extended = (max(0, y0 - halo), min(height, y1 + halo), max(0, x0 - halo), min(width, x1 + halo))
+            tiles.append(((y0, y1, x0, x1), extended))
+
+    # Share the points by density mass
+    total_mass = sum(
+        _density_mass(grayscale_array[y0:y1, x0:x1], value_range, white_threshold, white_blur_sigma)
+        for (y0, y1, x0, x1), _ in tiles
+    )
+    if total_mass <= 0:
+        raise ValueError("Density is zero everywhere")
+
+    def tile_arguments():
+        for idx, (core, (y0, y1, x0, x1)) in enumerate(tiles):
+            crop = np.array(grayscale_array[y0:y1, x0:x1])
+            tile_mass = _density_mass(crop, value_range, white_threshold, white_blur_sigma)
+            tile_points = int(round(points * tile_mass / total_mass))
+            if tile_points > 0:
+                yield idx, (crop, zoom, tile_points, value_range, memmap_dir, np.random.randint(2 ** 32), options)
+
     result = []
-    for idx, grayscale_array in enumerate(grayscale_arrays):
+    tile_indices = []
+    stats = []
+
+    def collect(idx, tile_result):
+        stippled, tile_stats = tile_result
+        (y0, y1, x0, x1), (ey0, _, ex0, _) = tiles[idx]
+        stippled = stippled + np.array([ex0, ey0])
+        inside = (x0 <= stippled[:, 0]) & (stippled[:, 0] < x1) & (y0 <= stippled[:, 1]) & (stippled[:, 1] < y1)
+        result.append(stippled[inside])
+        tile_indices.append(np.full(inside.sum(), idx))
+        stats.extend(_ | {"tile": idx} for _ in tile_stats)
         if logging:
-            print(f"Stippling image {idx + 1}/{len(grayscale_arrays)}", file=sys.stderr)
+            print(f"Stippled tile {idx + 1}/{len(tiles)}", file=sys.stderr)
+
+    if workers == 1:
+        for idx, arguments in tile_arguments():
+            collect(idx, _stipple_tile(*arguments))
+    else:
+        # Only keep a few tiles in flight, so the crops don't all pile up in memory
+        max_pending = 2 * (workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = {}
+            for idx, arguments in tile_arguments():
+                if len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(pending.pop(future), future.result())
+                pending[executor.submit(_stipple_tile, *arguments)] = idx
+            for future in as_completed(pending):
+                collect(pending[future], future.result())
+
+    stippled = merge_seam_points(np.concatenate(result), np.concatenate(tile_indices))
+
+    if return_stats:
+        return stippled, stats
+
+    return stippled
+
+
+def _stipple_shared(name, shape, array_dtype, seed, options):
+    # Process pool worker, the grayscale array lives in shared memory
+    shared = SharedMemory(name=name)
+    try:
+        np.random.seed(seed)
+        grayscale_array = np.ndarray(shape, dtype=array_dtype, buffer=shared.buf)
+        return stipple_image(grayscale_array=grayscale_array, return_stats=True, logging=False, **options)
+    finally:
+        shared.close()
 
-        stippled = stipple_image(
-            grayscale_array=grayscale_array,
-            points=points,
-            iterations=iterations,
-            logging=logging
-        )
 
-        result.append(stippled)
+def stipple_image_multi(
+        grayscale_arrays,
+        points=5000,
+        iterations=50,
+        method=CentroidMethod.OUTLINE,
+        init_method=InitializationMethod.REJECTION,
+        tolerance=None,
+        criterion=ConvergenceCriterion.MEAN,
+        freeze_tolerance=None,
+        border_only=False,
+        pyramid_levels=1,
+        refine_iterations=10,
+        initial_points_list=None,
+        tile_size=None,
+        halo=None,
+        memmap_dir=None,
+        dtype=np.float64,
+        memory_budget=None,
+        white_threshold=None,
+        white_blur_sigma=1,
+        workers=1,
+        return_stats=False,
+        logging=True
+):
+    """
+    Stipple every grayscale array (channel) with stipple_image.
+
+    With workers other than 1, the channels are stippled concurrently in
+    a process pool of that many workers (None for one per CPU). The arrays
+    are handed to the workers through shared memory instead of pickling.
+
+    initial_points_list optionally gives the initial_points of every
+    channel, to warm start them.
+
+    With tile_size, every channel is stippled with stipple_image_tiled
+    instead (one after the other, workers then applying to the tiles).
+
+    With memory_budget (bytes), dtype and tile_size are picked to fit it
+    instead (see plan_memory).
+    """
+
+    if memory_budget is not None:
+        shape = max((np.shape(_) for _ in grayscale_arrays), key=lambda _: _[0] * _[1])
+        jobs = len(grayscale_arrays) if workers is None else min(workers, len(grayscale_arrays))
+        dtype, planned_tile_size = plan_memory(shape, points, method, memory_budget, jobs)
+        if tile_size is not None or planned_tile_size is not None:
+            # Tiled channels run one after another, with up to workers tiles at once
+            jobs = workers or os.cpu_count() or 1
+            dtype, planned_tile_size = plan_memory(shape, points, method, memory_budget, jobs)
+        if tile_size is None:
+            tile_size = planned_tile_size
+        if logging:
+            print(f"Stippling in {np.dtype(dtype).name}"
+                  f"{'' if tile_size is None else f' with {tile_size} pixels tiles'}", file=sys.stderr)
+
+    options = dict(
+        points=points,
+        iterations=iterations,
+        method=method,
+        init_method=init_method,
+        tolerance=tolerance,
+        criterion=criterion,
+        freeze_tolerance=freeze_tolerance,
+        border_only=border_only,
+        pyramid_levels=pyramid_levels,
+        refine_iterations=refine_iterations,
+        dtype=dtype,
+        white_threshold=white_threshold,
+        white_blur_sigma=white_blur_sigma
+    )
+    if initial_points_list is None:
+        initial_points_list = [None] * len(grayscale_arrays)
+    options_list = [options | {"initial_points": _} for _ in initial_points_list]
+
+    if tile_size is not None:
+        if pyramid_levels > 1 or any(_ is not None for _ in initial_points_list):
+            raise ValueError("Tiled stippling does not support pyramid levels or warm starts")
+        del options["pyramid_levels"], options["refine_iterations"]
+
+        result = []
+        stats = []
+        for idx, grayscale_array in enumerate(grayscale_arrays):
+            if logging:
+                print(f"Stippling image {idx + 1}/{len(grayscale_arrays)}", file=sys.stderr)
+
+            stippled, stippled_stats = stipple_image_tiled(
+                grayscale_array=grayscale_array,
+                tile_size=tile_size,
+                halo=halo,
+                memmap_dir=memmap_dir,
+                workers=workers,
+                return_stats=True,
+                logging=logging,
+                **options
+            )
+
+            result.append(stippled)
+            stats.append(stippled_stats)
+    elif workers == 1:
+        result = []
+        stats = []
+        for idx, grayscale_array in enumerate(grayscale_arrays):
+            if logging:
+                print(f"Stippling image {idx + 1}/{len(grayscale_arrays)}", file=sys.stderr)
+
+            stippled, stippled_stats = stipple_image(
+                grayscale_array=grayscale_array,
+                return_stats=True,
+                logging=logging,
+                **options_list[idx]
+            )
+
+            result.append(stippled)
+            stats.append(stippled_stats)
+    else:
+        result, stats = _stipple_image_multi_parallel(grayscale_arrays, options_list, workers, logging)
+
+    if return_stats:
+        return result, stats
 
     return result
+
+
+def _stipple_image_multi_parallel(grayscale_arrays, options_list, workers, logging):
+    result = [None] * len(grayscale_arrays)
+    stats = [None] * len(grayscale_arrays)
+    shared_arrays = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for idx, grayscale_array in enumerate(grayscale_arrays):
+                grayscale_array = np.asarray(grayscale_array)
+                shared = SharedMemory(create=True, size=max(1, grayscale_array.nbytes))
+                shared_arrays.append(shared)
+                np.ndarray(grayscale_array.shape, dtype=grayscale_array.dtype, buffer=shared.buf)[:] = grayscale_array
+
+                future = executor.submit(
+                    _stipple_shared,
+                    shared.name,
+                    grayscale_array.shape,
+                    grayscale_array.dtype,
+                    np.random.randint(2 ** 32),
+                    options_list[idx]
+                )
+                futures[future] = idx
+
+            if logging:
+                print(f"Stippling {len(grayscale_arrays)} images in parallel", file=sys.stderr)
+
+            for future in as_completed(futures):
+                idx = futures[future]
+                result[idx], stats[idx] = future.result()
+                if logging:
+                    print(f"Stippled image {idx + 1}/{len(grayscale_arrays)}", file=sys.stderr)
+    finally:
+        for shared in shared_arrays:
+            shared.close()
+            shared.unlink()
+
+    return result, stats